@@ -0,0 +1,170 @@
+import argparse
+import gc
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import vendor_core as core
+
+# Run from the repository root:  python -m benchmarks.bench_core [--baseline old.json]
+VENDOR_SCALES = [10, 1_000, 10_000]
+MONTH_SCALES = [3, 24, 60]
+WORKER_SCALES = [10, 1_000, 50_000]
+RISK_SCALAR_MAX = 100_000  # the per-score loop is only timed up to this many scores
+# Sub-millisecond timings are mostly noise; smaller absolute changes never count as regressions
+TIME_NOISE_S = 0.002
+MEMORY_NOISE_MIB = 0.5
+
+def measure(func, repeat):
+    # Best-of-N wall time without tracing, then one traced run for peak Python heap
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / 2**20
+
+def build_cases(num_vendors, num_months, export_max_rows, streaming_max_rows):
+    df = core.normalize_dataset(core.generate_vendor_data(num_vendors, num_months))
+    store = core.VendorStore(df)
+    summary = core.format_vendor_summary(core.build_vendor_summary(store))
+    vendor = store.vendors[num_vendors // 2]
+    scores = store.df['skor_evaluasi'].values
+    months = store.df['bulan'].values
+    risk = core.classify_risk(scores)
+
+    cases = {
+        'generate_vendor_data': lambda: core.generate_vendor_data(num_vendors, num_months),
+        'vendor_store': lambda: core.VendorStore(df),
+        'predict_future_scores': lambda: core.predict_future_scores(store, vendor),
+        'forecast_scores': lambda: core.forecast_scores(store),
+        'risk_status_arrays': lambda: core.risk_status_arrays(scores),
+        'risk_distribution': lambda: core.risk_distribution(months, risk),
+        'laporan_summary': lambda: core.format_vendor_summary(core.build_vendor_summary(store)),
+    }
+    if len(scores) <= RISK_SCALAR_MAX:
+        cases['get_risk_status'] = lambda: [core.get_risk_status(score) for score in scores]
+    if len(summary) <= export_max_rows:
+        cases['summary_excel'] = lambda: core.build_summary_excel(summary, io.BytesIO())
+    if len(df) <= export_max_rows:
+        cases['detail_excel'] = lambda: core.build_detail_excel(df, io.BytesIO())
+    if len(df) <= streaming_max_rows:
+        # Forced, so the constant-memory writer is measured below EXPORT_STREAMING_ROWS too
+        cases['detail_excel_streaming'] = lambda: core.build_detail_excel(df, io.BytesIO(), streaming=True)
+    return len(df), cases
+
+def build_worker_cases(worker_scales):
+    # Worker tables depend only on the headcount, not on the dataset size
+    month = pd.Timestamp('2024-01-01')
+    return {num_workers: (lambda n=num_workers: core.generate_worker_data('PT PMS', month, n))
+            for num_workers in worker_scales}
+
+def run(vendor_scales, month_scales, worker_scales, repeat, export_max_rows, streaming_max_rows, only=None):
+    results = []
+
+    def record(name, func, rows, **scale):
+        wall, peak = measure(func, repeat)
+        result = {'name': name, **scale, 'rows': rows, 'wall_s': round(wall, 6), 'peak_mib': round(peak, 3)}
+        results.append(result)
+        print(f"{name:<24} {scale_label(result):>14} {wall * 1000:>10.2f} ms {peak:>9.2f} MiB", flush=True)
+
+    for num_vendors in vendor_scales:
+        for num_months in month_scales:
+            rows, cases = build_cases(num_vendors, num_months, export_max_rows, streaming_max_rows)
+            for name, func in cases.items():
+                if not only or name in only:
+                    record(name, func, rows, vendors=num_vendors, months=num_months)
+    if not only or 'generate_worker_data' in only:
+        for num_workers, func in build_worker_cases(worker_scales).items():
+            record('generate_worker_data', func, num_workers, workers=num_workers)
+    return results
+
+def scale_label(result):
+    if 'workers' in result:
+        return f"{result['workers']} workers"
+    return f"{result['vendors']} x {result['months']}"
+
+def result_key(result):
+    return result['name'], result.get('vendors'), result.get('months'), result.get('workers')
+
+def compare(results, baseline, threshold):
+    # Returns the cases whose wall time or peak memory grew by more than `threshold`
+    previous = {result_key(result): result for result in baseline['results']}
+    regressions = []
+    print(f"\n{'case':<40} {'time':>8} {'memory':>8}")
+    for result in results:
+        old = previous.get(result_key(result))
+        if old is None:
+            continue
+        time_ratio = result['wall_s'] / old['wall_s'] if old['wall_s'] else 1.0
+        mem_ratio = result['peak_mib'] / old['peak_mib'] if old['peak_mib'] else 1.0
+        label = f"{result['name']} {scale_label(result)}"
+        flag = ''
+        slower = time_ratio > 1 + threshold and result['wall_s'] - old['wall_s'] > TIME_NOISE_S
+        larger = mem_ratio > 1 + threshold and result['peak_mib'] - old['peak_mib'] > MEMORY_NOISE_MIB
+        if slower or larger:
+            regressions.append(label)
+            flag = '  REGRESSION'
+        print(f"{label:<40} {time_ratio:>7.2f}x {mem_ratio:>7.2f}x{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the VendorPro data and compute functions.")
+    parser.add_argument('--vendors', type=int, nargs='+', default=VENDOR_SCALES)
+    parser.add_argument('--months', type=int, nargs='+', default=MONTH_SCALES)
+    parser.add_argument('--workers', type=int, nargs='+', default=WORKER_SCALES,
+                        help="headcounts for the worker table case")
+    parser.add_argument('--only', nargs='+', help="run only these cases")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--export-max-rows', type=int, default=100_000,
+                        help="skip Excel exports larger than this (they take minutes)")
+    parser.add_argument('--streaming-max-rows', type=int, default=250_000,
+                        help="skip streaming detail exports larger than this")
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--baseline', help="earlier results file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="allowed relative slowdown / memory growth before failing")
+    args = parser.parse_args(argv)
+
+    results = run(args.vendors, args.months, args.workers, args.repeat, args.export_max_rows,
+                  args.streaming_max_rows, args.only)
+    report = {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
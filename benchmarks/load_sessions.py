@@ -0,0 +1,213 @@
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from packaging.version import Version
+
+# Run from the repository root:  python -m benchmarks.load_sessions --sessions 8 [--vendors 1000 --months 24]
+# Everything runs in-process against the app's synthetic dataset; no server or network is needed.
+APP_PATH = Path(__file__).resolve().parent.parent / "streamlit_app.py"
+FLOW = ["Dashboard", "Multi Vendor", "Prediksi", "Pekerja", "Laporan"]
+PERCENTILES = [50, 90, 99]
+# The app and the thread-mode patches below were written against this release; keep in
+# step with requirements.txt
+MIN_STREAMLIT = "1.65"
+
+os.environ.setdefault("STREAMLIT_BROWSER_GATHER_USAGE_STATS", "false")
+os.environ.setdefault("VENDORPRO_METRICS_DIR", str(Path(tempfile.gettempdir()) / "vendorpro_load_metrics"))
+
+def rss_mib():
+    # Current resident set size; falls back to the peak where /proc is not available
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+def choose(rng, widget):
+    return rng.choice(list(widget.options))
+
+def page_actions(at, page, rng):
+    # Randomized widget changes made on each page; every one of them is a rerun
+    if page == "Dashboard":
+        yield at.selectbox(key="dash_vendor").set_value(choose(rng, at.selectbox(key="dash_vendor")))
+        yield at.selectbox(key="dash_month").set_value(choose(rng, at.selectbox(key="dash_month")))
+    elif page == "Multi Vendor":
+        yield at.radio[0].set_value(rng.choice(["Combined View", "Card View", "Risk Distribution"]))
+    elif page == "Prediksi":
+        yield at.selectbox(key="pred_vendor").set_value(choose(rng, at.selectbox(key="pred_vendor")))
+    elif page == "Pekerja":
+        yield at.selectbox(key="worker_vendor").set_value(choose(rng, at.selectbox(key="worker_vendor")))
+        yield at.selectbox(key="worker_month").set_value(choose(rng, at.selectbox(key="worker_month")))
+
+def check_streamlit(mode):
+    # The app needs recent APIs, and share_app_test_runtime() patches Streamlit internals
+    # that are not public API, so refuse to run rather than fail mid-session
+    import streamlit
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    if Version(streamlit.__version__) < Version(MIN_STREAMLIT):
+        sys.exit(f"load_sessions needs streamlit>={MIN_STREAMLIT}, found {streamlit.__version__}")
+    missing = [f"{module.__name__}.{name}" for module, name in [
+        (app_test, 'Runtime'), (app_test, 'ScriptCache'), (app_test, 'DataframeSourceManager'),
+        (app_test, 'BidiComponentManager'), (local_script_runner, 'ScriptCache'),
+    ] if not hasattr(module, name)]
+    if mode == 'thread' and missing:
+        sys.exit(f"streamlit {streamlit.__version__} changed the AppTest internals this harness patches "
+                 f"(missing {', '.join(missing)}); use --mode process or a tested release")
+
+def share_app_test_runtime():
+    # A Streamlit server has one runtime and compiles the script once for all sessions.
+    # AppTest instead installs a fresh mock runtime and script cache for every run and
+    # clears the global runtime afterwards, so concurrent sessions would tear down each
+    # other's runtime mid-run. Pin one shared runtime and one pre-compiled script instead.
+    from unittest.mock import MagicMock
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = app_test.DataframeSourceManager()
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    runtime.bidi_component_registry = app_test.BidiComponentManager()
+    runtime.bidi_component_registry.discover_and_register_components(start_file_watching=False)
+    Runtime._instance = runtime
+
+    class RunLocalRuntime:
+        # Absorbs AppTest's per-run install/clear of the runtime
+        _instance = None
+
+    script_cache = ScriptCache()
+    script_cache.get_bytecode(str(APP_PATH))
+    app_test.Runtime = RunLocalRuntime
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+
+def run_session(session_id, rounds, seed, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + session_id)
+    latencies = {page: [] for page in FLOW}
+    errors = []
+
+    def rerun(page, widget):
+        start = time.perf_counter()
+        widget.run(timeout=timeout)
+        latencies[page].append(time.perf_counter() - start)
+        errors.extend(f"{page}: {exception.message}" for exception in at.exception)
+        return not at.exception
+
+    at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+    try:
+        at.run()
+        for _ in range(rounds):
+            for page in FLOW:
+                if not rerun(page, at.button(key=f"nav_{page}").click()):
+                    continue
+                for widget in page_actions(at, page, rng):
+                    if not rerun(page, widget):
+                        break
+    except Exception as exc:
+        # e.g. a timeout, or a widget missing from a page; keep the other sessions going
+        errors.append(f"session aborted: {type(exc).__name__}: {exc}")
+    return {'session': session_id, 'latencies': latencies, 'errors': errors, 'rss_mib': rss_mib()}
+
+def summarize(sessions, elapsed, baseline_rss, mode, dataset):
+    latencies = {page: [] for page in FLOW}
+    for session in sessions:
+        for page, values in session['latencies'].items():
+            latencies[page].extend(values)
+    reruns = sum(len(values) for values in latencies.values())
+
+    pages = {}
+    for page, values in latencies.items():
+        pages[page] = {'reruns': len(values)}
+        values = np.array(values or [np.nan]) * 1000
+        pages[page].update({f"p{p}_ms": round(float(np.percentile(values, p)), 1) for p in PERCENTILES})
+
+    if mode == 'thread':
+        # All sessions share this process, the way they share one Streamlit server
+        process_rss = rss_mib()
+        rss = {'process_mib': round(process_rss, 1),
+               'per_session_mib': round((process_rss - baseline_rss) / len(sessions), 1)}
+    else:
+        worker_rss = [session['rss_mib'] for session in sessions]
+        rss = {'max_worker_mib': round(max(worker_rss), 1),
+               'mean_worker_mib': round(float(np.mean(worker_rss)), 1)}
+    return {
+        'sessions': len(sessions),
+        'mode': mode,
+        'dataset': dataset,
+        'reruns': reruns,
+        'errors': sum(len(session['errors']) for session in sessions),
+        'error_messages': sorted({message for session in sessions for message in session['errors']}),
+        'elapsed_s': round(elapsed, 2),
+        'reruns_per_s': round(reruns / elapsed, 2),
+        'pages': pages,
+        'rss': rss,
+    }
+
+def print_report(report):
+    dataset = report['dataset']
+    print(f"{report['sessions']} sessions ({report['mode']} mode) on {dataset['vendors']:,} vendors x "
+          f"{dataset['months']} months, {report['reruns']} reruns in "
+          f"{report['elapsed_s']} s -> {report['reruns_per_s']} reruns/s, {report['errors']} errors")
+    header = ''.join(f"{f'p{p}':>10}" for p in PERCENTILES)
+    print(f"\n{'page':<14}{'reruns':>8}{header}")
+    for page, stats in report['pages'].items():
+        row = ''.join(f"{stats[f'p{p}_ms']:>8.1f}ms" for p in PERCENTILES)
+        print(f"{page:<14}{stats['reruns']:>8}{row}")
+    print('\nRSS: ' + ', '.join(f"{name} {value} MiB" for name, value in report['rss'].items()))
+    for message in report['error_messages']:
+        print(f"error: {message}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive streamlit_app.py with concurrent simulated sessions.")
+    parser.add_argument('--sessions', type=int, default=8)
+    parser.add_argument('--rounds', type=int, default=3, help="passes through the page flow per session")
+    parser.add_argument('--mode', choices=['thread', 'process'], default='thread',
+                        help="thread: sessions share one process like one server; process: one per worker")
+    parser.add_argument('--workers', type=int, help="pool size (default: one per session)")
+    parser.add_argument('--vendors', type=int, default=6, help="size of the app's synthetic dataset")
+    parser.add_argument('--months', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--output', help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    check_streamlit(args.mode)
+    # Read by the app on every run; process-mode workers inherit it
+    os.environ["VENDORPRO_SYNTHETIC_VENDORS"] = str(args.vendors)
+    os.environ["VENDORPRO_SYNTHETIC_MONTHS"] = str(args.months)
+    baseline_rss = rss_mib()
+    if args.mode == 'thread':
+        share_app_test_runtime()
+    executor = ThreadPoolExecutor if args.mode == 'thread' else ProcessPoolExecutor
+    start = time.perf_counter()
+    with executor(max_workers=args.workers or args.sessions) as pool:
+        futures = [pool.submit(run_session, i, args.rounds, args.seed, args.timeout)
+                   for i in range(args.sessions)]
+        sessions = [future.result() for future in futures]
+    report = summarize(sessions, time.perf_counter() - start, baseline_rss, args.mode,
+                       {'vendors': args.vendors, 'months': args.months})
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 1 if report['errors'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,118 +1,923 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
+import plotly.io as pio
+import plotly.colors as pc
 from datetime import datetime
 import numpy as np
-import io
+import os
+import json
+import logging
+import time
+import functools
+import contextlib
+import hashlib
+import tempfile
+from pathlib import Path
+import threading
+import weakref
+import atexit
+import socket
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import vendor_core
+from vendor_core import (
+    DEFAULT_NUM_WORKERS, WORKER_SCORE_RANGE, WORKER_PAGE_SIZE, DISPLAY_COLUMNS, EXCEL_MIME,
+    top_workers, score_histogram, page_count, page_rows,
+    lttb_indices, top_vendor_indices, percentile_band, RISK_LEVELS, filter_vendor_summary,
+    SqliteStore, SqlVendorStore, build_store_detail_excel,
+    upsert_frame, update_vendor_summary, update_forecasts,
+    VendorStore, dataset_fingerprint, normalize_dataset, memory_report,
+    forecast_scores, get_risk_status, build_vendor_summary, format_vendor_summary,
+    DEFAULT_RISK_THRESHOLDS, RISK_COLORS, classify_risk, risk_status_arrays, risk_distribution,
+    build_summary_excel, content_hash, read_excel_streaming, DiskCache, validate_dataset,
+)
 
-# Mock data generators
-@st.cache_data
-def generate_vendor_data():
-    vendors = ["PT PMS", "PT KARYA JAYA", "PT MANDIRI SEJAHTERA", 
-               "PT SUKSES BERSAMA", "PT MAKMUR ABADI", "PT MITRA USAHA"]
-    months = pd.date_range('2023-06-01', '2023-08-01', freq='MS')
-    
-    data = []
-    for vendor in vendors:
-        base_score = np.random.randint(75, 90)
-        for month in months:
-            score = base_score + np.random.randint(-5, 8)
-            data.append({
-                'vendor': vendor,
-                'bulan': month,
-                'skor_evaluasi': min(100, max(60, score)),
-                'jumlah_pekerja': np.random.randint(80, 150),
-                'waktu_thp': np.random.randint(85, 100),
-                'kehadiran': np.random.randint(85, 100),
-                'thr': np.random.randint(80, 100),
-                'bpjs_tk': np.random.randint(75, 100),
-                'bpjs_kes': np.random.randint(75, 100),
-                'dpslk': np.random.randint(70, 100)
+# Performance instrumentation
+METRICS_DIR = Path(os.environ.get("VENDORPRO_METRICS_DIR", Path(tempfile.gettempdir()) / "vendorpro_metrics"))
+METRICS_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+METRICS_SAMPLES = 1000
+PROMETHEUS_WRITE_INTERVAL = 1.0
+# reruns.jsonl rolls over to reruns.jsonl.1 .. .N at this size, so it never fills the volume
+METRICS_JSONL_MAX_BYTES = 10 * 2**20
+METRICS_JSONL_BACKUPS = 4
+
+class RerunTrace:
+    def __init__(self, kind, page):
+        self.kind = kind
+        self.page = page
+        self.started = time.perf_counter()
+        self.spans = {}
+        self.cache = {}
+
+class PerfRecorder:
+    # Process-wide timings and cache counters. Each script or fragment run becomes one
+    # JSONL record; aggregates are exported as a Prometheus textfile-collector file. Replicas
+    # may share the metrics directory, so each process writes its own file, labelled with the
+    # process, and removes it on exit.
+    def __init__(self, metrics_dir):
+        self.metrics_dir = Path(metrics_dir)
+        self.jsonl_path = self.metrics_dir / "reruns.jsonl"
+        self.process = f"{socket.gethostname()}-{os.getpid()}"
+        self.prometheus_path = self.metrics_dir / f"vendorpro-{self.process}.prom"
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._histograms = {}
+        self._samples = {}
+        self._cache_counts = {}
+        self._last_export = 0.0
+
+    def begin(self, kind, page):
+        previous = getattr(self._local, 'trace', None)
+        if previous is not None:
+            # The last run ended early (st.rerun / st.stop); keep what it measured
+            self._flush(previous, interrupted=True)
+        self._local.trace = RerunTrace(kind, page)
+
+    def end(self, error=None):
+        trace = getattr(self._local, 'trace', None)
+        self._local.trace = None
+        if trace is not None:
+            self._flush(trace, error=error)
+
+    @contextlib.contextmanager
+    def span(self, name):
+        trace = getattr(self._local, 'trace', None)
+        standalone = trace is None
+        if standalone:
+            # A fragment rerun does not execute the script top level, so it gets its own record
+            self.begin('fragment', st.session_state.get('current_page'))
+            trace = self._local.trace
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            trace.spans[name] = trace.spans.get(name, 0.0) + elapsed
+            self._observe(f"span:{name}", elapsed)
+            if standalone:
+                self.end()
+
+    def count_cache(self, cache_name, hit):
+        result = 'hit' if hit else 'miss'
+        with self._lock:
+            key = (cache_name, result)
+            self._cache_counts[key] = self._cache_counts.get(key, 0) + 1
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            counts = trace.cache.setdefault(cache_name, {'hit': 0, 'miss': 0})
+            counts[result] += 1
+
+    def span_stats(self):
+        with self._lock:
+            samples = {name: np.array(values) for name, values in self._samples.items()}
+            histograms = {name: (hist['count'], hist['sum']) for name, hist in self._histograms.items()}
+        rows = []
+        for name, values in sorted(samples.items()):
+            count, total = histograms[name]
+            rows.append({
+                'Span': name,
+                'Count': count,
+                'Mean (ms)': round(total / count * 1000, 2),
+                'p50 (ms)': round(float(np.percentile(values, 50)) * 1000, 2),
+                'p95 (ms)': round(float(np.percentile(values, 95)) * 1000, 2),
             })
-    return pd.DataFrame(data)
-
-def generate_worker_data(vendor, month, num_workers=10):
-    np.random.seed(hash(vendor + str(month)) % 2**32)
-    workers = [f"Pekerja {i+1}" for i in range(num_workers)]
-    scores = np.random.randint(70, 100, num_workers)
-    return pd.DataFrame({'pekerja': workers, 'skor': scores})
-
-def predict_future_scores(df, vendor, months=3):
-    vendor_data = df[df['vendor'] == vendor].sort_values('bulan')
-    if len(vendor_data) < 2:
-        return []
-    
-    last_score = vendor_data['skor_evaluasi'].iloc[-1]
-    last_month = vendor_data['bulan'].iloc[-1]
-    scores = vendor_data['skor_evaluasi'].values
-    trend = (scores[-1] - scores[0]) / len(scores)
-    
-    predictions = []
-    for i in range(1, months + 1):
-        next_month = last_month + pd.DateOffset(months=i)
-        predicted_score = last_score + (trend * i) + np.random.randint(-2, 3)
-        predicted_score = min(100, max(60, int(predicted_score)))
-        variance = np.var(scores)
-        confidence = max(70, min(95, int(90 - variance)))
-        
-        predictions.append({
-            'bulan': next_month,
-            'skor_prediksi': predicted_score,
-            'confidence': confidence
+        return pd.DataFrame(rows, columns=['Span', 'Count', 'Mean (ms)', 'p50 (ms)', 'p95 (ms)'])
+
+    def cache_stats(self):
+        with self._lock:
+            counts = dict(self._cache_counts)
+        names = sorted({name for name, _ in counts})
+        return pd.DataFrame({
+            'Cache': names,
+            'Hits': [counts.get((name, 'hit'), 0) for name in names],
+            'Misses': [counts.get((name, 'miss'), 0) for name in names],
         })
-    return predictions
 
-def get_risk_status(score):
-    if score >= 85:
-        return "Low Risk", "#10b981"
-    elif score >= 70:
-        return "Medium Risk", "#f59e0b"
+    def _observe(self, name, seconds):
+        with self._lock:
+            hist = self._histograms.setdefault(name, {'buckets': [0] * len(METRICS_BUCKETS), 'count': 0, 'sum': 0.0})
+            for i, bound in enumerate(METRICS_BUCKETS):
+                if seconds <= bound:
+                    hist['buckets'][i] += 1
+            hist['count'] += 1
+            hist['sum'] += seconds
+            self._samples.setdefault(name, deque(maxlen=METRICS_SAMPLES)).append(seconds)
+
+    def _flush(self, trace, interrupted=False, error=None):
+        total = time.perf_counter() - trace.started
+        self._observe(f"{trace.kind}:{trace.page}", total)
+        record = {
+            'ts': time.time(),
+            'kind': trace.kind,
+            'page': trace.page,
+            'interrupted': interrupted,
+            'total_ms': round(total * 1000, 3),
+            'spans_ms': {name: round(seconds * 1000, 3) for name, seconds in trace.spans.items()},
+            'cache': trace.cache,
+        }
+        if error is not None:
+            record['error'] = error
+        try:
+            self.metrics_dir.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                self._rotate_jsonl()
+                with open(self.jsonl_path, 'a') as log:
+                    log.write(json.dumps(record) + "\n")
+                if time.monotonic() - self._last_export >= PROMETHEUS_WRITE_INTERVAL:
+                    self._last_export = time.monotonic()
+                    self._write_prometheus()
+        except OSError:
+            # Metrics must never break a page render
+            pass
+
+    def _rotate_jsonl(self):
+        try:
+            if self.jsonl_path.stat().st_size < METRICS_JSONL_MAX_BYTES:
+                return
+        except FileNotFoundError:
+            return
+        for i in range(METRICS_JSONL_BACKUPS - 1, 0, -1):
+            older = self.jsonl_path.with_name(f"{self.jsonl_path.name}.{i}")
+            if older.exists():
+                os.replace(older, self.jsonl_path.with_name(f"{self.jsonl_path.name}.{i + 1}"))
+        os.replace(self.jsonl_path, self.jsonl_path.with_name(f"{self.jsonl_path.name}.1"))
+
+    def _write_prometheus(self):
+        lines = [
+            "# HELP vendorpro_duration_seconds Duration of reruns, fragment runs and instrumented spans.",
+            "# TYPE vendorpro_duration_seconds histogram",
+        ]
+        for name, hist in sorted(self._histograms.items()):
+            kind, _, target = name.partition(':')
+            target = target.replace('\\', '\\\\').replace('"', '\\"')
+            labels = f'process="{self.process}",kind="{kind}",name="{target}"'
+            for bound, count in zip(METRICS_BUCKETS, hist['buckets']):
+                lines.append(f'vendorpro_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'vendorpro_duration_seconds_bucket{{{labels},le="+Inf"}} {hist["count"]}')
+            lines.append(f'vendorpro_duration_seconds_sum{{{labels}}} {hist["sum"]:.6f}')
+            lines.append(f'vendorpro_duration_seconds_count{{{labels}}} {hist["count"]}')
+        lines += [
+            "# HELP vendorpro_cache_requests_total Data cache lookups by result.",
+            "# TYPE vendorpro_cache_requests_total counter",
+        ]
+        for (cache_name, result), count in sorted(self._cache_counts.items()):
+            lines.append(f'vendorpro_cache_requests_total{{process="{self.process}",cache="{cache_name}",'
+                         f'result="{result}"}} {count}')
+        fd, tmp_path = tempfile.mkstemp(dir=self.metrics_dir, suffix='.prom.tmp')
+        with os.fdopen(fd, 'w') as tmp:
+            tmp.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.prometheus_path)
+
+    def remove_prometheus(self):
+        # A stopped process's counters must not linger in the collector's directory
+        with contextlib.suppress(OSError):
+            self.prometheus_path.unlink()
+
+@st.cache_resource
+def perf_recorder():
+    recorder = PerfRecorder(METRICS_DIR)
+    atexit.register(recorder.remove_prometheus)
+    return recorder
+
+def traced(name):
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with perf_recorder().span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def counted_cache(cache_name, cache):
+    # Applies an st.cache_* decorator and counts hits/misses: the wrapped body only
+    # runs on a miss, so a per-thread flag tells the two apart
+    def decorate(func):
+        state = threading.local()
+
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            state.missed = True
+            return func(*args, **kwargs)
+        cached = cache(compute)
+
+        @functools.wraps(func)
+        def lookup(*args, **kwargs):
+            state.missed = False
+            result = cached(*args, **kwargs)
+            perf_recorder().count_cache(cache_name, hit=not state.missed)
+            return result
+        lookup.clear = cached.clear
+        return lookup
+    return decorate
+
+# Optional disk cache: with VENDORPRO_CACHE_DIR set, derived data survives restarts and is
+# shared by every replica on the host. The in-memory caches above it still serve repeats.
+DISK_CACHE_DIR = os.environ.get("VENDORPRO_CACHE_DIR")
+DISK_CACHE_TTL = float(os.environ.get("VENDORPRO_CACHE_TTL", 7 * 24 * 3600))  # seconds, 0 = no expiry
+DISK_CACHE_MAX_MB = float(os.environ.get("VENDORPRO_CACHE_MAX_MB", 1024))
+
+@st.cache_resource
+def disk_cache():
+    if not DISK_CACHE_DIR:
+        return None
+    return DiskCache(DISK_CACHE_DIR, ttl=DISK_CACHE_TTL or None, max_bytes=int(DISK_CACHE_MAX_MB * 2**20))
+
+def disk_cached(namespace, fingerprint, params, compute):
+    cache = disk_cache()
+    if cache is None:
+        return compute()
+    missed = []
+
+    def compute_on_miss():
+        missed.append(True)
+        return compute()
+    value = cache.get_or_compute(namespace, fingerprint, params, compute_on_miss)
+    perf_recorder().count_cache(f"disk:{namespace}", hit=not missed)
+    return value
+
+# Mock data generators
+SYNTHETIC = 'synthetic'  # fingerprint of generated data, which depends only on its parameters
+# Size of the built-in dataset; the load harness raises it to production scale
+SYNTHETIC_VENDORS = int(os.environ.get("VENDORPRO_SYNTHETIC_VENDORS", 6))
+SYNTHETIC_MONTHS = int(os.environ.get("VENDORPRO_SYNTHETIC_MONTHS", 3))
+
+@st.cache_data
+def generate_vendor_data(num_vendors=6, num_months=3, seed=42):
+    return disk_cached('vendor_data', SYNTHETIC, (num_vendors, num_months, seed),
+                       lambda: vendor_core.generate_vendor_data(num_vendors, num_months, seed))
+
+# Worker tables are shared across sessions; bound how many (vendor, month) entries stay resident
+WORKER_CACHE_ENTRIES = 256
+
+@counted_cache('worker_data', st.cache_data(max_entries=WORKER_CACHE_ENTRIES))
+def generate_worker_data(vendor, month, num_workers=DEFAULT_NUM_WORKERS):
+    return disk_cached('worker_data', SYNTHETIC, (str(vendor), f"{pd.Timestamp(month):%Y-%m}", num_workers),
+                       lambda: vendor_core.generate_worker_data(vendor, month, num_workers))
+
+@counted_cache('default_dataset', st.cache_resource)
+def load_default_dataset():
+    raw_df = generate_vendor_data(SYNTHETIC_VENDORS, SYNTHETIC_MONTHS)
+    df = normalize_dataset(raw_df)
+    return df, dataset_fingerprint(df), memory_report(raw_df, df)
+
+@counted_cache('vendor_store', st.cache_resource(max_entries=8))
+def load_vendor_store(data_version, _df):
+    return VendorStore(_df)
+
+@counted_cache('forecasts', st.cache_resource(max_entries=8))
+def load_forecasts(data_version, horizon, _store):
+    def compute():
+        parent = dataset_lineage().get(data_version)
+        if parent is not None and horizon in parent.forecasts:
+            return update_forecasts(parent.forecasts[horizon], _store, parent.vendors, horizon)
+        return forecast_scores(_store, horizon)
+    return disk_cached('forecasts', data_version, (horizon,), compute)
+
+@counted_cache('vendor_summary', st.cache_resource(max_entries=8))
+def load_vendor_summary(data_version, thresholds, _store):
+    def compute():
+        parent = dataset_lineage().get(data_version)
+        if parent is not None:
+            summary = update_vendor_summary(parent.summary, _store, parent.vendors, thresholds)
+        else:
+            summary = build_vendor_summary(_store, thresholds)
+        return summary, format_vendor_summary(summary)
+    return disk_cached('vendor_summary', data_version, (thresholds,), compute)
+
+@counted_cache('risk_column', st.cache_resource(max_entries=8))
+def load_risk_column(data_version, thresholds, _store):
+    # Risk band of every row of an in-memory store, aligned with store.df
+    return classify_risk(_store.df['skor_evaluasi'].values, thresholds)
+
+@counted_cache('risk_distribution', st.cache_resource(max_entries=8))
+def load_risk_distribution(data_version, thresholds, _store):
+    if isinstance(_store, SqlVendorStore):
+        return _store.risk_distribution(thresholds)
+    return risk_distribution(_store.df['bulan'].values, load_risk_column(data_version, thresholds, _store))
+
+# Dataset lineage: a version produced by a monthly upsert remembers its parent's derived
+# views and which vendors changed, so only those vendors are recomputed
+LINEAGE_ENTRIES = 16
+
+class Lineage:
+    def __init__(self, vendors, summary, forecasts):
+        self.vendors = vendors
+        self.summary = summary
+        self.forecasts = forecasts
+
+class DatasetLineage:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, data_version, lineage):
+        with self._lock:
+            self._entries[data_version] = lineage
+            self._entries.move_to_end(data_version)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, data_version):
+        with self._lock:
+            return self._entries.get(data_version)
+
+@st.cache_resource
+def dataset_lineage():
+    return DatasetLineage(LINEAGE_ENTRIES)
+
+# Excel exports: without VENDORPRO_CACHE_DIR they go to a private size-bounded cache in the
+# temp directory, so old dataset versions age out instead of piling up
+EXPORT_DIR = Path(tempfile.gettempdir()) / "vendorpro_exports"
+EXPORT_DIR_MAX_MB = 512
+
+@st.cache_resource
+def export_cache():
+    return disk_cache() or DiskCache(EXPORT_DIR, max_bytes=EXPORT_DIR_MAX_MB * 2**20)
+
+def write_export(data_version, kind, thresholds, store, target):
+    if kind == 'summary':
+        build_summary_excel(load_vendor_summary(data_version, thresholds, store)[1], target)
     else:
-        return "High Risk", "#ef4444"
+        build_store_detail_excel(store, target)
 
-# Page Config
-st.set_page_config(
-    page_title="VendorPro Dashboard",
-    page_icon="VP",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+def export_file(data_version, kind, thresholds, store):
+    # Looked up on every download rather than memoized: the cache may have evicted the
+    # file, or something else may have cleaned the directory, since the last one.
+    # The summary's Status column depends on the risk thresholds; the detail sheet does not.
+    missed = []
 
-# Initialize session state
-if 'dark_mode' not in st.session_state:
-    st.session_state['dark_mode'] = True
-if 'current_page' not in st.session_state:
-    st.session_state['current_page'] = "Dashboard"
+    def write(target):
+        missed.append(True)
+        write_export(data_version, kind, thresholds, store, target)
+    params = (kind, thresholds) if kind == 'summary' else (kind,)
+    path = export_cache().file('export', data_version, params, write)
+    perf_recorder().count_cache('export', hit=not missed)
+    return path
 
-dark_mode = st.session_state['dark_mode']
+# Excel upload ingestion
+def ingest_upload(content, progress=None):
+    # Parsed once per file content; reruns while the file stays attached (and other
+    # sessions uploading the same file) reuse the registered frame
+    upload_hash = content_hash(content)
+    registry = dataset_registry()
+    entry = registry.get(upload_hash)
+    perf_recorder().count_cache('upload', hit=entry is not None)
+    if entry is None:
+        raw_df = read_excel_streaming(content, progress)
+        uploaded_df = normalize_dataset(raw_df)
+        # Invalid frames never reach the registry, so no session can switch to one
+        validate_dataset(uploaded_df)
+        entry = registry.put(upload_hash, uploaded_df, dataset_stats(raw_df, uploaded_df))
+    return upload_hash, entry.df, entry.stats
 
-# Color scheme
-if dark_mode:
-    bg_main = "#1a1d29"
-    bg_card = "#232734"
-    text_primary = "#ffffff"
-    text_secondary = "#8b92b0"
-    border_color = "#2d3348"
-    sidebar_bg = "#1e2130"
-    accent = "#5b7cfa"
-    chart_text = "#ffffff"
-else:
-    bg_main = "#f5f7fa"
-    bg_card = "#ffffff"
-    text_primary = "#2d3748"
-    text_secondary = "#718096"
-    border_color = "#e2e8f0"
-    sidebar_bg = "#ffffff"
-    accent = "#5b7cfa"
-    chart_text = "#2d3748"
+def dataset_stats(raw_df, df):
+    return {
+        'rows': len(df),
+        'columns': len(df.columns),
+        'vendors': df['vendor'].nunique() if 'vendor' in df.columns else 0,
+        'months': df['bulan'].nunique() if 'bulan' in df.columns else 0,
+        'memory': memory_report(raw_df, df),
+    }
 
-# Custom CSS
-st.markdown(f"""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-    
+def apply_upsert(delta, name, parent_version, parent_store):
+    # Merges a monthly delta into the active dataset as a new dataset and switches this
+    # session to it. The parent's summary and forecasts are cached already, so hand them down.
+    db = sqlite_store()
+    if 'db_dataset' in st.session_state:
+        dataset_id, merged_into, vendors = db.upsert(st.session_state['db_dataset'], name, delta)
+    else:
+        merged, vendors = upsert_frame(parent_store.df, delta)
+        dataset_id = dataset_fingerprint(merged)
+        merged_into = parent_version
+        if db is not None:
+            if db.data_version(dataset_id) is None:
+                db.save_dataset(dataset_id, name, merged)
+        else:
+            dataset_registry().put(dataset_id, merged, dataset_stats(merged, merged))
+    new_version = db.data_version(dataset_id) if db is not None else dataset_id
+    # parent_store comes from this session's last full run; if the database held another
+    # version by the time of the merge, its results don't match and the next load recomputes
+    if merged_into == parent_version:
+        summary, _ = load_vendor_summary(parent_version, st.session_state['risk_thresholds'], parent_store)
+        forecasts = {3: load_forecasts(parent_version, 3, parent_store)}
+        dataset_lineage().record(new_version, Lineage(vendors, summary, forecasts))
+
+    if 'dataset' in st.session_state:
+        st.session_state.pop('dataset').release()
+    if db is not None:
+        st.session_state['db_dataset'] = dataset_id
+    else:
+        st.session_state['dataset'] = dataset_registry().acquire(dataset_id)
+    return len(vendors)
+
+# Dataset registry
+DATASET_MEMORY_BUDGET = 1024 * 2**20
+
+class DatasetEntry:
+    def __init__(self, df, stats):
+        self.df = df
+        self.stats = stats
+        self.nbytes = int(df.memory_usage(deep=True).sum())
+        self.refs = 0
+
+class DatasetHandle:
+    # What a session keeps in st.session_state: the dataset id plus one reference,
+    # released explicitly on reset or when the session state is garbage collected
+    def __init__(self, registry, dataset_id):
+        self.dataset_id = dataset_id
+        self._finalizer = weakref.finalize(self, registry.release, dataset_id)
+
+    def release(self):
+        self._finalizer()
+
+class DatasetRegistry:
+    # Process-wide, content-addressed store of uploaded datasets. Referenced datasets
+    # are pinned; unreferenced ones stay cached until the memory budget forces them
+    # out, least recently used first.
+    def __init__(self, memory_budget):
+        self.memory_budget = memory_budget
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, dataset_id):
+        with self._lock:
+            entry = self._entries.get(dataset_id)
+            if entry is not None:
+                self._entries.move_to_end(dataset_id)
+            return entry
+
+    def put(self, dataset_id, df, stats):
+        with self._lock:
+            if dataset_id not in self._entries:
+                self._entries[dataset_id] = DatasetEntry(df, stats)
+            self._entries.move_to_end(dataset_id)
+            self._evict(keep=dataset_id)
+            return self._entries[dataset_id]
+
+    def acquire(self, dataset_id):
+        with self._lock:
+            self._entries[dataset_id].refs += 1
+        return DatasetHandle(self, dataset_id)
+
+    def release(self, dataset_id):
+        with self._lock:
+            entry = self._entries.get(dataset_id)
+            if entry is not None:
+                entry.refs -= 1
+            self._evict()
+
+    def usage(self):
+        with self._lock:
+            return {
+                'datasets': len(self._entries),
+                'referenced': sum(entry.refs > 0 for entry in self._entries.values()),
+                'nbytes': sum(entry.nbytes for entry in self._entries.values()),
+                'budget': self.memory_budget,
+            }
+
+    def _evict(self, keep=None):
+        total = sum(entry.nbytes for entry in self._entries.values())
+        for dataset_id in list(self._entries):
+            if total <= self.memory_budget:
+                break
+            entry = self._entries[dataset_id]
+            if entry.refs <= 0 and dataset_id != keep:
+                total -= entry.nbytes
+                del self._entries[dataset_id]
+
+@st.cache_resource
+def dataset_registry():
+    return DatasetRegistry(DATASET_MEMORY_BUDGET)
+
+# Optional SQLite persistence: with VENDORPRO_DB set to a file path, uploads are kept
+# across restarts and pages query only the rows they show
+DATABASE_PATH = os.environ.get("VENDORPRO_DB")
+
+@st.cache_resource
+def sqlite_store():
+    return SqliteStore(DATABASE_PATH) if DATABASE_PATH else None
+
+@counted_cache('sql_store', st.cache_resource(max_entries=8))
+def load_sql_store(data_version, dataset_id):
+    return SqlVendorStore(sqlite_store(), dataset_id)
+
+# Themes and chart figures
+ACCENT = "#5b7cfa"
+THEMES = {
+    'dark': {
+        'bg_main': "#1a1d29",
+        'bg_card': "#232734",
+        'text_primary': "#ffffff",
+        'text_secondary': "#8b92b0",
+        'border_color': "#2d3348",
+        'sidebar_bg': "#1e2130",
+        'accent': ACCENT,
+        'chart_text': "#ffffff",
+    },
+    'light': {
+        'bg_main': "#f5f7fa",
+        'bg_card': "#ffffff",
+        'text_primary': "#2d3748",
+        'text_secondary': "#718096",
+        'border_color': "#e2e8f0",
+        'sidebar_bg': "#ffffff",
+        'accent': ACCENT,
+        'chart_text': "#2d3748",
+    },
+}
+SERIES_COLORS = [ACCENT, '#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#06b6d4']
+FIGURE_CACHE_ENTRIES = 256
+
+@st.cache_resource
+def chart_template(theme_name):
+    # Trace defaults per theme, built on Streamlit's own template so its colorway and
+    # placeholders still apply
+    colors = THEMES[theme_name]
+    template = go.layout.Template(pio.templates['streamlit'])
+    template.data.bar = [go.Bar(textfont=dict(color=colors['text_primary']))]
+    return template
+
+@st.cache_resource
+def chart_layout(theme_name):
+    # Theme colors go on the figure's own layout: st.plotly_chart merges Streamlit's theme
+    # over layout.template.layout, which would override them there
+    colors = THEMES[theme_name]
+    return dict(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family=FONT_STACK, color=colors['chart_text']),
+        xaxis=dict(gridcolor=colors['border_color'], linecolor=colors['border_color']),
+        yaxis=dict(gridcolor=colors['border_color'], linecolor=colors['border_color']),
+    )
+
+@counted_cache('figure', st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False))
+def cached_figure(view, params, theme_name, data_version, _build):
+    # Keyed only on what changes the figure; `_build` is not hashed. Returned figures
+    # are shared across sessions and must not be mutated by callers.
+    fig = _build()
+    fig.update_layout(template=chart_template(theme_name), **chart_layout(theme_name))
+    return fig
+
+def trend_figure(vendor_trend):
+    fig_trend = go.Figure()
+    fig_trend.add_trace(go.Scatter(
+        x=vendor_trend['bulan'],
+        y=vendor_trend['skor_evaluasi'],
+        mode='lines',
+        line=dict(color=ACCENT, width=3, shape='spline'),
+        fill='tonexty',
+        fillcolor=f'rgba(91, 124, 250, 0.1)',
+        hovertemplate='<b>%{x|%B %Y}</b><br>Score: %{y}<extra></extra>'
+    ))
+    fig_trend.update_layout(
+        height=300,
+        margin=dict(t=10, b=30, l=40, r=10),
+        font=dict(size=11),
+        xaxis=dict(showgrid=False, showline=True, tickformat='%b %Y'),
+        yaxis=dict(showgrid=True, range=[0, 100]),
+        hovermode='x unified',
+        showlegend=False
+    )
+    return fig_trend
+
+def top_workers_figure(worker_df):
+    fig_bar = go.Figure()
+    fig_bar.add_trace(go.Bar(
+        y=worker_df['pekerja'],
+        x=worker_df['skor'],
+        orientation='h',
+        marker=dict(color=ACCENT, line=dict(width=0)),
+        text=worker_df['skor'],
+        textposition='outside',
+        textfont=dict(size=11, family=FONT_STACK),
+        hovertemplate='<b>%{y}</b><br>Score: %{x}<extra></extra>'
+    ))
+    fig_bar.update_layout(
+        height=300,
+        margin=dict(t=10, b=30, l=100, r=10),
+        font=dict(size=10),
+        xaxis=dict(showgrid=True, showline=False, range=[0, 110]),
+        yaxis=dict(showgrid=False, showline=False),
+        showlegend=False
+    )
+    return fig_bar
+
+# Combined View limits: beyond these the chart switches to WebGL, downsampled
+# series, or the top-N + percentile band aggregation
+COMBINED_MAX_VENDORS = 20
+COMBINED_TOP_N = 10
+COMBINED_MAX_POINTS = 120
+WEBGL_MIN_POINTS = 1_000
+COMBINED_COLORS = SERIES_COLORS + pc.qualitative.Dark24
+CARDS_PER_PAGE = 12
+DETAIL_PAGE_SIZE = 1_000
+
+def combined_figure(store, top_n=COMBINED_TOP_N):
+    fig = go.Figure()
+    aggregate = len(store.vendors) > COMBINED_MAX_VENDORS
+    shown = top_vendor_indices(store, top_n) if aggregate else range(len(store.vendors))
+    large = aggregate or len(store) > WEBGL_MIN_POINTS
+    # WebGL traces keep the browser responsive once there are thousands of points
+    scatter = go.Scattergl if large else go.Scatter
+
+    for idx, vendor_pos in enumerate(shown):
+        vendor = store.vendors[vendor_pos]
+        vendor_data = store.series(vendor)
+        months, scores = vendor_data['bulan'].values, vendor_data['skor_evaluasi'].values
+        keep = lttb_indices(months.astype('int64'), scores, COMBINED_MAX_POINTS)
+        fig.add_trace(scatter(
+            x=months[keep],
+            y=scores[keep],
+            mode='lines' if large else 'lines+markers',
+            name=vendor,
+            line=dict(color=COMBINED_COLORS[idx % len(COMBINED_COLORS)], width=2 if large else 3),
+            marker=dict(size=8),
+            hovertemplate=f'<b>{vendor}</b><br>%{{x|%b %Y}}<br>Score: %{{y}}<extra></extra>'
+        ))
+
+    if aggregate:
+        # Every vendor outside the top N collapses into a 10th-90th percentile band plus median
+        rest = np.ones(len(store.vendors), dtype=bool)
+        rest[shown] = False
+        low, median, high = percentile_band(store.matrix('skor_evaluasi')[rest])
+        keep = lttb_indices(store.months.asi8, np.nan_to_num(median), COMBINED_MAX_POINTS)
+        months = store.months[keep]
+        label = f"Other {rest.sum()} vendors"
+        fig.add_trace(go.Scatter(
+            x=np.concatenate([months, months[::-1]]),
+            y=np.concatenate([high[keep], low[keep][::-1]]),
+            fill='toself',
+            fillcolor='rgba(148, 163, 184, 0.2)',
+            line=dict(width=0),
+            name=f"{label} (p10-p90)",
+            hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatter(
+            x=months,
+            y=median[keep],
+            mode='lines',
+            name=f"{label} (median)",
+            line=dict(color='#94a3b8', width=2, dash='dash'),
+            hovertemplate=f'<b>{label}</b><br>%{{x|%b %Y}}<br>Median: %{{y:.1f}}<extra></extra>'
+        ))
+
+    fig.update_layout(
+        height=450,
+        margin=dict(t=20, b=40, l=40, r=20),
+        font=dict(size=12),
+        xaxis=dict(showgrid=True, tickformat='%b %Y'),
+        yaxis=dict(showgrid=True, title="Score", range=[50, 100]),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+        # A unified hover label listing every trace gets unreadable (and slow) past a few vendors
+        hovermode='closest' if large else 'x unified'
+    )
+    return fig
+
+def prediction_figure(vendor_data, predictions):
+    fig_pred = go.Figure()
+    fig_pred.add_trace(go.Scatter(
+        x=vendor_data['bulan'],
+        y=vendor_data['skor_evaluasi'],
+        mode='lines+markers',
+        name='Actual',
+        line=dict(color=ACCENT, width=3),
+        marker=dict(size=10, color=ACCENT),
+        hovertemplate='<b>Actual</b><br>%{x|%B %Y}<br>Score: %{y}<extra></extra>'
+    ))
+    pred_dates = [p['bulan'] for p in predictions]
+    pred_scores = [p['skor_prediksi'] for p in predictions]
+    fig_pred.add_trace(go.Scatter(
+        x=pred_dates + pred_dates[::-1],
+        y=[p['upper'] for p in predictions] + [p['lower'] for p in predictions][::-1],
+        fill='toself',
+        fillcolor='rgba(16, 185, 129, 0.12)',
+        line=dict(width=0),
+        name='95% Interval',
+        hoverinfo='skip'
+    ))
+    fig_pred.add_trace(go.Scatter(
+        x=[vendor_data['bulan'].iloc[-1]] + pred_dates,
+        y=[vendor_data['skor_evaluasi'].iloc[-1]] + pred_scores,
+        mode='lines+markers',
+        name='Prediction',
+        line=dict(color='#10b981', width=3, dash='dot'),
+        marker=dict(size=10, color='#10b981'),
+        hovertemplate='<b>Prediction</b><br>%{x|%B %Y}<br>Score: %{y}<extra></extra>'
+    ))
+    fig_pred.update_layout(
+        height=350,
+        margin=dict(t=20, b=40, l=40, r=20),
+        font=dict(size=12),
+        xaxis=dict(showgrid=True, tickformat='%b %Y'),
+        yaxis=dict(showgrid=True, title="Score"),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5)
+    )
+    return fig_pred
+
+def histogram_figure(counts, edges):
+    # Bins are counted server-side; the browser only receives one bar per bin
+    widths = np.diff(edges)
+    fig_hist = go.Figure(data=[go.Bar(
+        x=edges[:-1] + widths / 2,
+        y=counts,
+        width=widths,
+        marker_color=ACCENT,
+        marker_line_color='white',
+        marker_line_width=1.5,
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        hovertemplate='Score %{customdata[0]:.0f}-%{customdata[1]:.0f}<br>Count: %{y}<extra></extra>'
+    )])
+    fig_hist.update_layout(
+        height=400,
+        margin=dict(t=10, b=30, l=40, r=10),
+        font=dict(size=11),
+        xaxis=dict(showgrid=False, title="Score", showline=True),
+        yaxis=dict(showgrid=True, title="Count"),
+        showlegend=False
+    )
+    return fig_hist
+
+def risk_distribution_figure(counts):
+    fig_risk = go.Figure()
+    months = counts.index.strftime('%b %Y')
+    for level, color in zip(counts.columns, RISK_COLORS):
+        fig_risk.add_trace(go.Bar(
+            x=months,
+            y=counts[level].values,
+            name=level,
+            marker_color=color,
+            hovertemplate=f'%{{x}}<br>{level}: %{{y}} vendors<extra></extra>'
+        ))
+    fig_risk.update_layout(
+        barmode='stack',
+        height=400,
+        margin=dict(t=30, b=30, l=40, r=10),
+        font=dict(size=11),
+        xaxis=dict(showgrid=False, type='category'),
+        yaxis=dict(showgrid=True, title="Vendors"),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5)
+    )
+    return fig_risk
+
+# Dashboard figures for one vendor and period; shared with the warm-up so both use the same cache keys
+def dashboard_trend_figure(store, data_version, theme_name, vendor):
+    return cached_figure('trend', (vendor,), theme_name, data_version,
+                         lambda: trend_figure(store.series(vendor)))
+
+def dashboard_top_workers_figure(data_version, theme_name, vendor, month_date, num_workers):
+    def build():
+        worker_df = generate_worker_data(vendor, month_date, num_workers)
+        return top_workers_figure(top_workers(worker_df, 10))
+    return cached_figure('top_workers', (vendor, month_date, num_workers), theme_name, data_version, build)
+
+# Background warm-up: once a dataset is loaded, its derived views are computed on a small
+# thread pool so the first visit to each page finds them cached. A page that asks for a
+# view still being computed waits on the cache's per-key lock instead of recomputing it.
+WARMUP_WORKERS = 2
+WARMUP_ENTRIES = 16
+WARMUP_POLL_S = 1.0
+WARMUP_THREAD_PREFIX = 'vendorpro-warmup'
+warmup_logger = logging.getLogger('vendorpro.warmup')
+
+class WarmupLogFilter(logging.Filter):
+    # Warm-up threads belong to no session, so Streamlit's "missing ScriptRunContext"
+    # warning (raised by cache spinners) is expected there and only noise
+    def filter(self, record):
+        return not threading.current_thread().name.startswith(WARMUP_THREAD_PREFIX)
+
+class Warmup:
+    def __init__(self, futures):
+        self.futures = futures
+
+    def progress(self):
+        return sum(future.done() for future in self.futures.values()), len(self.futures)
+
+class WarmupRegistry:
+    # One warm-up per (dataset version, settings) key, shared by every session
+    def __init__(self, max_workers, max_entries):
+        self.max_entries = max_entries
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=WARMUP_THREAD_PREFIX)
+        logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').addFilter(WarmupLogFilter())
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, key, tasks):
+        with self._lock:
+            warmup = self._entries.get(key)
+            if warmup is None:
+                futures = {name: self._pool.submit(run_warmup_task, name, task) for name, task in tasks.items()}
+                for name, future in futures.items():
+                    future.add_done_callback(functools.partial(log_warmup_failure, name))
+                warmup = Warmup(futures)
+                self._entries[key] = warmup
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return warmup
+
+def run_warmup_task(name, task):
+    perf = perf_recorder()
+    perf.begin('warmup', name)
+    try:
+        task()
+    except Exception as exc:
+        perf.end(error=f"{type(exc).__name__}: {exc}")
+        raise
+    perf.end()
+
+def log_warmup_failure(name, future):
+    # Nobody waits on warm-up futures, so a failure would otherwise vanish; the page
+    # that needs the value recomputes it and reports any error itself
+    if not future.cancelled() and future.exception() is not None:
+        warmup_logger.error("Warm-up task %r failed", name, exc_info=future.exception())
+
+@st.cache_resource
+def warmup_registry():
+    return WarmupRegistry(WARMUP_WORKERS, WARMUP_ENTRIES)
+
+def start_warmup(data_version, store, thresholds, num_workers, theme_name):
+    # The Dashboard opens on the first vendor and the latest period
+    if not store.vendors:
+        return None
+    vendor = store.vendors[0]
+    month_date = pd.to_datetime(store.month_labels[-1], format='%B %Y')
+    tasks = {
+        'Latest per vendor': store.latest,
+        'Vendor summary': lambda: load_vendor_summary(data_version, thresholds, store),
+        'Forecasts': lambda: load_forecasts(data_version, 3, store),
+        'Trend chart': lambda: dashboard_trend_figure(store, data_version, theme_name, vendor),
+        'Top workers chart': lambda: dashboard_top_workers_figure(data_version, theme_name, vendor,
+                                                                  month_date, num_workers),
+    }
+    return warmup_registry().start((data_version, thresholds, num_workers, theme_name), tasks)
+
+@st.fragment(run_every=WARMUP_POLL_S)
+def warmup_status(warmup):
+    done, total = warmup.progress()
+    if done < total:
+        st.progress(done / total, text=f"Preparing data: {done}/{total}")
+    else:
+        # One full rerun drops this fragment, which stops the polling
+        st.rerun()
+
+# Stylesheets
+STATIC_DIR = Path(__file__).parent / "static"
+FONT_STACK = "system-ui, -apple-system, 'Segoe UI', Roboto, sans-serif"
+
+def compile_stylesheet(theme_name):
+    colors = THEMES[theme_name]
+    bg_main = colors['bg_main']
+    bg_card = colors['bg_card']
+    text_primary = colors['text_primary']
+    text_secondary = colors['text_secondary']
+    border_color = colors['border_color']
+    sidebar_bg = colors['sidebar_bg']
+    accent = colors['accent']
+    return f"""
     * {{
-        font-family: 'Inter', sans-serif;
+        font-family: {FONT_STACK};
     }}
     
     .stApp {{
@@ -258,6 +1063,18 @@ st.markdown(f"""
         height: 100%;
     }}
     
+    .card-grid {{
+        display: grid;
+        grid-template-columns: repeat(3, minmax(0, 1fr));
+        gap: 1rem;
+    }}
+    
+    @media (max-width: 900px) {{
+        .card-grid {{
+            grid-template-columns: minmax(0, 1fr);
+        }}
+    }}
+    
     .metric-label {{
         color: {text_secondary};
         font-size: 0.875rem;
@@ -332,15 +1149,115 @@ st.markdown(f"""
     #MainMenu {{ visibility: hidden; }}
     footer {{ visibility: hidden; }}
     header {{ visibility: hidden; }}
-</style>
-""", unsafe_allow_html=True)
+"""
+
+def write_stylesheet(css_dir, theme_name, css):
+    # Content-hashed, so browsers cache it; older builds of the same theme are removed
+    digest = hashlib.sha256(css.encode()).hexdigest()[:12]
+    path = css_dir / f"vendorpro-{theme_name}.{digest}.css"
+    if not path.exists():
+        fd, tmp_path = tempfile.mkstemp(dir=css_dir, suffix='.css.tmp')
+        try:
+            # mkstemp creates owner-only files; the static server only needs to read them
+            os.chmod(tmp_path, 0o644)
+            with os.fdopen(fd, 'w') as tmp:
+                tmp.write(css)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    for old in css_dir.glob(f"vendorpro-{theme_name}.*.css"):
+        if old != path:
+            with contextlib.suppress(FileNotFoundError):
+                old.unlink()
+    return path
+
+@st.cache_resource
+def stylesheet_links():
+    # Compiled once per process and served from static/css, so reruns only carry a
+    # <link> tag. None when the app directory is not writable.
+    css_dir = STATIC_DIR / "css"
+    try:
+        css_dir.mkdir(parents=True, exist_ok=True)
+        paths = {theme_name: write_stylesheet(css_dir, theme_name, compile_stylesheet(theme_name))
+                 for theme_name in THEMES}
+    except OSError:
+        return None
+    return {theme_name: f"<link rel='stylesheet' href='app/static/css/{path.name}'>"
+            for theme_name, path in paths.items()}
+
+@st.cache_resource
+def inline_stylesheets():
+    # Fallback when static file serving is turned off or static/css cannot be written
+    return {theme_name: f"<style>{compile_stylesheet(theme_name)}</style>" for theme_name in THEMES}
+
+def stylesheet_tag(theme_name):
+    links = stylesheet_links() if st.get_option("server.enableStaticServing") else None
+    if links is None:
+        return inline_stylesheets()[theme_name]
+    return links[theme_name]
+
+# Page Config
+st.set_page_config(
+    page_title="VendorPro Dashboard",
+    page_icon="VP",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Initialize session state
+if 'dark_mode' not in st.session_state:
+    st.session_state['dark_mode'] = True
+if 'current_page' not in st.session_state:
+    st.session_state['current_page'] = "Dashboard"
+if 'num_workers' not in st.session_state:
+    st.session_state['num_workers'] = DEFAULT_NUM_WORKERS
+if 'risk_thresholds' not in st.session_state:
+    st.session_state['risk_thresholds'] = DEFAULT_RISK_THRESHOLDS
+
+# Timing for this script run; fragment reruns are recorded on their own
+perf = perf_recorder()
+perf.begin('script', st.session_state['current_page'])
+
+dark_mode = st.session_state['dark_mode']
+
+# Color scheme
+theme_name = 'dark' if dark_mode else 'light'
+colors = THEMES[theme_name]
+text_primary = colors['text_primary']
+text_secondary = colors['text_secondary']
+border_color = colors['border_color']
+accent = colors['accent']
+
+# Custom CSS
+st.markdown(stylesheet_tag(theme_name), unsafe_allow_html=True)
 
 # Load Data
-df = generate_vendor_data()
-if 'uploaded_data' in st.session_state:
-    df = st.session_state['uploaded_data']
+with perf.span('data_load'):
+    if 'db_dataset' in st.session_state:
+        # Persisted datasets are versioned, so an update in any process invalidates the caches
+        dataset_id = st.session_state['db_dataset']
+        data_version = sqlite_store().data_version(dataset_id)
+        store = load_sql_store(data_version, dataset_id)
+        dataset_memory = None
+    else:
+        df, data_version, dataset_memory = load_default_dataset()
+        if 'dataset' in st.session_state:
+            data_version = st.session_state['dataset'].dataset_id
+            entry = dataset_registry().get(data_version)
+            df, dataset_memory = entry.df, entry.stats['memory']
+        store = load_vendor_store(data_version, df)
+risk_thresholds = st.session_state['risk_thresholds']
+warmup = start_warmup(data_version, store, risk_thresholds, st.session_state['num_workers'], theme_name)
 
 # Sidebar
+# Navigation and theme changes run as callbacks before the script, so they cost one pass
+def navigate(page_key):
+    st.session_state['current_page'] = page_key
+
+def toggle_theme():
+    st.session_state['dark_mode'] = not st.session_state['dark_mode']
+
 with st.sidebar:
     st.markdown(f"""
     <div class='sidebar-title'>
@@ -362,21 +1279,20 @@ with st.sidebar:
     ]
     
     for page_key, label in pages:
-        if st.button(label, key=f"nav_{page_key}"):
-            st.session_state['current_page'] = page_key
-            st.rerun()
+        st.button(label, key=f"nav_{page_key}", on_click=navigate, args=(page_key,))
     
     st.markdown("</div>", unsafe_allow_html=True)
     
     st.markdown("<div class='nav-section'>", unsafe_allow_html=True)
     st.markdown("<div class='nav-label'>Preferences</div>", unsafe_allow_html=True)
     
-    if st.button(f"{'Dark Mode' if not dark_mode else 'Light Mode'}", key="theme_toggle"):
-        st.session_state['dark_mode'] = not st.session_state['dark_mode']
-        st.rerun()
+    st.button(f"{'Dark Mode' if not dark_mode else 'Light Mode'}", key="theme_toggle", on_click=toggle_theme)
     
     st.markdown("</div>", unsafe_allow_html=True)
 
+    if warmup is not None and warmup.progress()[0] < len(warmup.futures):
+        warmup_status(warmup)
+
 # Main Content
 page = st.session_state['current_page']
 
@@ -399,22 +1315,24 @@ def render_chart(title, subtitle, content_func):
             <div class='chart-header-subtitle'>{subtitle}</div>
         </div>
     """, unsafe_allow_html=True)
-    content_func()
+    # Each panel is its own fragment: widgets inside it rerun just this panel
+    st.fragment(traced(f"panel:{title}")(content_func))()
     st.markdown("</div></div>", unsafe_allow_html=True)
 
-if page == "Dashboard":
+@st.fragment
+@traced("page:Dashboard")
+def render_dashboard():
     # Filters
     col1, col2, col3 = st.columns([1, 1, 2])
     with col1:
-        selected_vendor = st.selectbox("Vendor", df['vendor'].unique(), key="dash_vendor")
+        selected_vendor = st.selectbox("Vendor", store.vendors, key="dash_vendor")
     with col2:
-        selected_month = st.selectbox("Period", df['bulan'].dt.strftime('%B %Y').unique(), index=2, key="dash_month")
+        selected_month = st.selectbox("Period", store.month_labels, index=len(store.month_labels) - 1, key="dash_month")
     
     month_date = pd.to_datetime(selected_month, format='%B %Y')
-    filtered_df = df[(df['bulan'] == month_date) & (df['vendor'] == selected_vendor)]
+    row = store.row(selected_vendor, month_date)
     
-    if not filtered_df.empty:
-        row = filtered_df.iloc[0]
+    if row is not None:
         
         # Metrics Row
         col1, col2, col3, col4 = st.columns(4)
@@ -422,8 +1340,8 @@ if page == "Dashboard":
         metrics = [
             {"label": "Total Workers", "value": f"{row['jumlah_pekerja']}", "change": "+12%", "positive": True},
             {"label": "Evaluation Score", "value": f"{row['skor_evaluasi']}", "change": "+5%", "positive": True},
-            {"label": "BPJS Compliance", "value": f"{int((row['bpjs_tk']+row['bpjs_kes'])/2)}%", "change": "+8%", "positive": True},
-            {"label": "Risk Status", "value": get_risk_status(row['skor_evaluasi'])[0], "change": "-2%", "positive": False}
+            {"label": "BPJS Compliance", "value": f"{(int(row['bpjs_tk']) + int(row['bpjs_kes'])) // 2}%", "change": "+8%", "positive": True},
+            {"label": "Risk Status", "value": get_risk_status(row['skor_evaluasi'], risk_thresholds)[0], "change": "-2%", "positive": False}
         ]
         
         for col, metric in zip([col1, col2, col3, col4], metrics):
@@ -444,28 +1362,7 @@ if page == "Dashboard":
         
         with col1:
             def trend_chart():
-                vendor_trend = df[df['vendor'] == selected_vendor].sort_values('bulan')
-                fig_trend = go.Figure()
-                fig_trend.add_trace(go.Scatter(
-                    x=vendor_trend['bulan'],
-                    y=vendor_trend['skor_evaluasi'],
-                    mode='lines',
-                    line=dict(color=accent, width=3, shape='spline'),
-                    fill='tonexty',
-                    fillcolor=f'rgba(91, 124, 250, 0.1)',
-                    hovertemplate='<b>%{x|%B %Y}</b><br>Score: %{y}<extra></extra>'
-                ))
-                fig_trend.update_layout(
-                    height=300,
-                    margin=dict(t=10, b=30, l=40, r=10),
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(family='Inter', size=11, color=chart_text),
-                    xaxis=dict(showgrid=False, showline=True, linecolor=border_color, tickformat='%b %Y'),
-                    yaxis=dict(showgrid=True, gridcolor=border_color, range=[0, 100]),
-                    hovermode='x unified',
-                    showlegend=False
-                )
+                fig_trend = dashboard_trend_figure(store, data_version, theme_name, selected_vendor)
                 st.plotly_chart(fig_trend, use_container_width=True, config={'displayModeBar': False})
             render_chart(
                 "Performance Trend",
@@ -525,29 +1422,8 @@ if page == "Dashboard":
         
         with col2:
             def top_workers_chart():
-                worker_df = generate_worker_data(selected_vendor, month_date)
-                worker_df = worker_df.sort_values('skor', ascending=False).head(10)
-                fig_bar = go.Figure()
-                fig_bar.add_trace(go.Bar(
-                    y=worker_df['pekerja'],
-                    x=worker_df['skor'],
-                    orientation='h',
-                    marker=dict(color=accent, line=dict(width=0)),
-                    text=worker_df['skor'],
-                    textposition='outside',
-                    textfont=dict(size=11, color=text_primary, family='Inter'),
-                    hovertemplate='<b>%{y}</b><br>Score: %{x}<extra></extra>'
-                ))
-                fig_bar.update_layout(
-                    height=300,
-                    margin=dict(t=10, b=30, l=100, r=10),
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(family='Inter', size=10, color=chart_text),
-                    xaxis=dict(showgrid=True, gridcolor=border_color, showline=False, range=[0, 110]),
-                    yaxis=dict(showgrid=False, showline=False),
-                    showlegend=False
-                )
+                fig_bar = dashboard_top_workers_figure(data_version, theme_name, selected_vendor, month_date,
+                                                       st.session_state['num_workers'])
                 st.plotly_chart(fig_bar, use_container_width=True, config={'displayModeBar': False})
             render_chart(
                 "Top 10 Workers",
@@ -555,35 +1431,21 @@ if page == "Dashboard":
                 top_workers_chart
             )
 
-elif page == "Multi Vendor":
-    view_mode = st.radio("", ["Combined View", "Card View"], horizontal=True)
+@st.fragment
+@traced("page:Multi Vendor")
+def render_multi_vendor():
+    view_mode = st.radio("", ["Combined View", "Card View", "Risk Distribution"], horizontal=True)
     
     if view_mode == "Combined View":
         def combined_view_chart():
-            fig = go.Figure()
-            colors = [accent, '#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#06b6d4']
-            for idx, vendor in enumerate(df['vendor'].unique()):
-                vendor_data = df[df['vendor'] == vendor].sort_values('bulan')
-                fig.add_trace(go.Scatter(
-                    x=vendor_data['bulan'],
-                    y=vendor_data['skor_evaluasi'],
-                    mode='lines+markers',
-                    name=vendor,
-                    line=dict(color=colors[idx % len(colors)], width=3),
-                    marker=dict(size=8),
-                    hovertemplate=f'<b>{vendor}</b><br>%{{x|%b %Y}}<br>Score: %{{y}}<extra></extra>'
-                ))
-            fig.update_layout(
-                height=450,
-                margin=dict(t=20, b=40, l=40, r=20),
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(family='Inter', size=12, color=chart_text),
-                xaxis=dict(showgrid=True, gridcolor=border_color, tickformat='%b %Y'),
-                yaxis=dict(showgrid=True, gridcolor=border_color, title="Score", range=[50, 100]),
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
-                hovermode='x unified'
-            )
+            top_n = COMBINED_TOP_N
+            if len(store.vendors) > COMBINED_MAX_VENDORS:
+                top_n = st.slider("Vendors drawn individually", 1, COMBINED_MAX_VENDORS, COMBINED_TOP_N,
+                                  key="combined_top_n")
+                st.caption(f"Top {top_n} of {len(store.vendors)} vendors by average score; "
+                           f"the shaded band covers the 10th-90th percentile of the rest.")
+            fig = cached_figure('combined', (top_n,), theme_name, data_version,
+                                lambda: combined_figure(store, top_n))
             st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
         render_chart(
             "All Vendors Performance",
@@ -591,53 +1453,88 @@ elif page == "Multi Vendor":
             combined_view_chart
         )
     
+    elif view_mode == "Risk Distribution":
+        def risk_distribution_chart():
+            counts = load_risk_distribution(data_version, risk_thresholds, store)
+            fig = cached_figure('risk_distribution', risk_thresholds, theme_name, data_version,
+                                lambda: risk_distribution_figure(counts))
+            st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+        low_from, medium_from = risk_thresholds
+        render_chart(
+            "Risk Distribution",
+            f"Vendors per risk band each month – Low Risk from {low_from}, Medium Risk from {medium_from}",
+            risk_distribution_chart
+        )
+
     else:
-        latest_month = df['bulan'].max()
-        for i in range(0, len(df['vendor'].unique()), 3):
-            cols = st.columns(3)
-            vendors_batch = list(df['vendor'].unique())[i:i+3]
-            for idx, vendor in enumerate(vendors_batch):
-                with cols[idx]:
-                    vendor_data = df[df['vendor'] == vendor].sort_values('bulan')
-                    latest = vendor_data[vendor_data['bulan'] == latest_month].iloc[0]
-                    status, color = get_risk_status(latest['skor_evaluasi'])
-                    st.markdown(f"""
-                    <div class='metric-card'>
-                        <div style='display: flex; justify-content: space-between; align-items: start; margin-bottom: 1rem;'>
-                            <div>
-                                <h4 style='color: {text_primary}; font-size: 1rem; font-weight: 600; margin: 0 0 0.25rem 0;'>{vendor}</h4>
-                                <p style='color: {text_secondary}; font-size: 0.75rem; margin: 0;'>{latest['jumlah_pekerja']} Workers</p>
-                            </div>
-                            <div style='background: {color}; color: white; padding: 0.25rem 0.75rem; border-radius: 12px; font-size: 0.75rem; font-weight: 600;'>{status}</div>
-                        </div>
-                        <div style='display: flex; justify-content: space-between; margin-top: 1rem;'>
-                            <div>
-                                <div style='color: {text_secondary}; font-size: 0.75rem; margin-bottom: 0.25rem; font-weight: 500;'>SCORE</div>
-                                <div style='color: {color}; font-size: 1.5rem; font-weight: 700;'>{latest['skor_evaluasi']}</div>
-                            </div>
-                            <div>
-                                <div style='color: {text_secondary}; font-size: 0.75rem; margin-bottom: 0.25rem; font-weight: 500;'>BPJS</div>
-                                <div style='color: {text_primary}; font-size: 1.5rem; font-weight: 700;'>{int((latest['bpjs_tk']+latest['bpjs_kes'])/2)}%</div>
-                            </div>
-                        </div>
+        summary, _ = load_vendor_summary(data_version, risk_thresholds, store)
+        col1, col2 = st.columns(2)
+        with col1:
+            statuses = st.multiselect("Risk status", RISK_LEVELS, default=RISK_LEVELS, key="card_risk")
+        with col2:
+            min_score, max_score = st.slider("Current score", 0, 100, (0, 100), key="card_score")
+        filtered = filter_vendor_summary(summary, statuses, min_score, max_score)
+
+        pages = page_count(len(filtered), CARDS_PER_PAGE)
+        if st.session_state.get('card_page', 1) > pages:
+            st.session_state['card_page'] = pages
+        if pages > 1:
+            page_number = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key="card_page")
+        else:
+            page_number = 1
+        page = page_rows(filtered, page_number, CARDS_PER_PAGE)
+        st.caption(f"{len(filtered)} of {len(summary)} vendors")
+
+        # One markdown call per page: the cards are laid out by the .card-grid CSS grid
+        cards = ''.join(f"""
+            <div class='metric-card'>
+                <div style='display: flex; justify-content: space-between; align-items: start; margin-bottom: 1rem;'>
+                    <div>
+                        <h4 style='color: {text_primary}; font-size: 1rem; font-weight: 600; margin: 0 0 0.25rem 0;'>{vendor}</h4>
+                        <p style='color: {text_secondary}; font-size: 0.75rem; margin: 0;'>{workers} Workers</p>
                     </div>
-                    """, unsafe_allow_html=True)
+                    <div style='background: {color}; color: white; padding: 0.25rem 0.75rem; border-radius: 12px; font-size: 0.75rem; font-weight: 600;'>{status}</div>
+                </div>
+                <div style='display: flex; justify-content: space-between; margin-top: 1rem;'>
+                    <div>
+                        <div style='color: {text_secondary}; font-size: 0.75rem; margin-bottom: 0.25rem; font-weight: 500;'>SCORE</div>
+                        <div style='color: {color}; font-size: 1.5rem; font-weight: 700;'>{score}</div>
+                    </div>
+                    <div>
+                        <div style='color: {text_secondary}; font-size: 0.75rem; margin-bottom: 0.25rem; font-weight: 500;'>BPJS</div>
+                        <div style='color: {text_primary}; font-size: 1.5rem; font-weight: 700;'>{bpjs}%</div>
+                    </div>
+                </div>
+            </div>"""
+            for vendor, workers, status, color, score, bpjs in zip(
+                page['vendor'], page['jumlah_pekerja'], page['current_status'], page['current_color'],
+                page['skor_evaluasi'], (page['bpjs_tk'].astype(int) + page['bpjs_kes'].astype(int)) // 2))
+        if cards:
+            st.markdown(f"<div class='card-grid'>{cards}</div>", unsafe_allow_html=True)
+        else:
+            st.info("No vendors match these filters.")
 
-elif page == "Prediksi":
-    selected_vendor = st.selectbox("Select Vendor", df['vendor'].unique(), key="pred_vendor")
+@st.fragment
+@traced("page:Prediksi")
+def render_predictions():
+    selected_vendor = st.selectbox("Select Vendor", store.vendors, key="pred_vendor")
     
-    vendor_data = df[df['vendor'] == selected_vendor].sort_values('bulan')
-    predictions = predict_future_scores(df, selected_vendor, 3)
+    vendor_data = store.series(selected_vendor)
+    predictions = load_forecasts(data_version, 3, store).for_vendor(selected_vendor)
     
     if predictions:
         col1, col2, col3 = st.columns(3)
         
-        current_score = vendor_data['skor_evaluasi'].iloc[-1]
+        current_score = int(vendor_data['skor_evaluasi'].iloc[-1])
         next_pred = predictions[0]
         trend = next_pred['skor_prediksi'] - current_score
         
+        # Current score and all forecast months are classified in one call
+        statuses, status_colors = risk_status_arrays(
+            [current_score] + [pred['skor_prediksi'] for pred in predictions], risk_thresholds)
+
         with col1:
-            status, color = get_risk_status(current_score)
+            status, color = statuses[0], status_colors[0]
             st.markdown(f"""
             <div class='metric-card'>
                 <div style='color: {text_secondary}; font-size: 0.875rem; font-weight: 500; margin-bottom: 0.5rem;'>Current Score</div>
@@ -661,37 +1558,8 @@ elif page == "Prediksi":
         st.markdown("<br>", unsafe_allow_html=True)
         
         def prediction_chart():
-            fig_pred = go.Figure()
-            fig_pred.add_trace(go.Scatter(
-                x=vendor_data['bulan'],
-                y=vendor_data['skor_evaluasi'],
-                mode='lines+markers',
-                name='Actual',
-                line=dict(color=accent, width=3),
-                marker=dict(size=10, color=accent),
-                hovertemplate='<b>Actual</b><br>%{x|%B %Y}<br>Score: %{y}<extra></extra>'
-            ))
-            pred_dates = [p['bulan'] for p in predictions]
-            pred_scores = [p['skor_prediksi'] for p in predictions]
-            fig_pred.add_trace(go.Scatter(
-                x=[vendor_data['bulan'].iloc[-1]] + pred_dates,
-                y=[vendor_data['skor_evaluasi'].iloc[-1]] + pred_scores,
-                mode='lines+markers',
-                name='Prediction',
-                line=dict(color='#10b981', width=3, dash='dot'),
-                marker=dict(size=10, color='#10b981'),
-                hovertemplate='<b>Prediction</b><br>%{x|%B %Y}<br>Score: %{y}<extra></extra>'
-            ))
-            fig_pred.update_layout(
-                height=350,
-                margin=dict(t=20, b=40, l=40, r=20),
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(family='Inter', size=12, color=text_primary),
-                xaxis=dict(showgrid=True, gridcolor=border_color, tickformat='%b %Y'),
-                yaxis=dict(showgrid=True, gridcolor=border_color, title="Score"),
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5)
-            )
+            fig_pred = cached_figure('prediction', (selected_vendor, len(predictions)), theme_name, data_version,
+                                     lambda: prediction_figure(vendor_data, predictions))
             st.plotly_chart(fig_pred, use_container_width=True, config={'displayModeBar': False})
         render_chart(
             "3 Months Prediction",
@@ -705,7 +1573,7 @@ elif page == "Prediksi":
         for idx, pred in enumerate(predictions):
             with cols[idx]:
                 pred_month = pred['bulan'].strftime('%B %Y')
-                status, color = get_risk_status(pred['skor_prediksi'])
+                status, color = statuses[idx + 1], status_colors[idx + 1]
                 st.markdown(f"""
                 <div class='metric-card' style='text-align: center;'>
                     <div style='color: {text_secondary}; font-size: 0.75rem; font-weight: 500; margin-bottom: 1rem;'>{pred_month}</div>
@@ -715,15 +1583,17 @@ elif page == "Prediksi":
                 </div>
                 """, unsafe_allow_html=True)
 
-elif page == "Pekerja":
+@st.fragment
+@traced("page:Pekerja")
+def render_workers():
     col1, col2 = st.columns(2)
     with col1:
-        selected_vendor = st.selectbox("Select Vendor", df['vendor'].unique(), key="worker_vendor")
+        selected_vendor = st.selectbox("Select Vendor", store.vendors, key="worker_vendor")
     with col2:
-        selected_month = st.selectbox("Select Period", df['bulan'].dt.strftime('%B %Y').unique(), index=2, key="worker_month")
+        selected_month = st.selectbox("Select Period", store.month_labels, index=len(store.month_labels) - 1, key="worker_month")
     
     month_date = pd.to_datetime(selected_month, format='%B %Y')
-    worker_df = generate_worker_data(selected_vendor, month_date)
+    worker_df = generate_worker_data(selected_vendor, month_date, st.session_state['num_workers'])
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -749,11 +1619,24 @@ elif page == "Pekerja":
     
     with col1:
         def workers_table():
+            # Large workforces are paged here so only one page of rows reaches the browser
+            rows = worker_df
+            pages = page_count(len(worker_df))
+            if pages > 1:
+                if st.session_state.get('worker_page', 1) > pages:
+                    st.session_state['worker_page'] = pages
+                page_number = st.number_input(f"Page (of {pages}, {WORKER_PAGE_SIZE} workers each)",
+                                              min_value=1, max_value=pages, step=1, key="worker_page")
+                rows = page_rows(worker_df, page_number)
+            # Scores are drawn as bars by the frontend; a Styler gradient would need
+            # matplotlib and per-cell CSS, which gets slow with thousands of workers
             st.dataframe(
-                worker_df.style.background_gradient(subset=['skor'], cmap='RdYlGn', vmin=70, vmax=100),
+                rows,
                 use_container_width=True,
                 hide_index=True,
-                height=400
+                height=400,
+                column_config={'skor': st.column_config.ProgressColumn(
+                    "skor", format="%d", min_value=WORKER_SCORE_RANGE[0], max_value=WORKER_SCORE_RANGE[1])}
             )
         render_chart(
             "Workers List",
@@ -763,23 +1646,8 @@ elif page == "Pekerja":
     
     with col2:
         def hist_chart():
-            fig_hist = go.Figure(data=[go.Histogram(
-                x=worker_df['skor'],
-                nbinsx=10,
-                marker_color=accent,
-                marker_line_color='white',
-                marker_line_width=1.5
-            )])
-            fig_hist.update_layout(
-                height=400,
-                margin=dict(t=10, b=30, l=40, r=10),
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(family='Inter', size=11, color=text_primary),
-                xaxis=dict(showgrid=False, title="Score", showline=True, linecolor=border_color),
-                yaxis=dict(showgrid=True, gridcolor=border_color, title="Count"),
-                showlegend=False
-            )
+            fig_hist = cached_figure('histogram', (selected_vendor, month_date, len(worker_df)), theme_name,
+                                     data_version, lambda: histogram_figure(*score_histogram(worker_df['skor'])))
             st.plotly_chart(fig_hist, use_container_width=True, config={'displayModeBar': False})
         render_chart(
             "Score Distribution",
@@ -787,39 +1655,11 @@ elif page == "Pekerja":
             hist_chart
         )
 
-elif page == "Laporan":
+@st.fragment
+@traced("page:Laporan")
+def render_reports():
     # Compute dataframes outside tabs
-    summary_data = []
-    for vendor in df['vendor'].unique():
-        vendor_data = df[df['vendor'] == vendor]
-        latest = vendor_data.sort_values('bulan').iloc[-1]
-        avg_score = vendor_data['skor_evaluasi'].mean()
-        status, _ = get_risk_status(avg_score)
-        summary_data.append({
-            'Vendor': vendor,
-            'Total Workers': latest['jumlah_pekerja'],
-            'Avg Score': round(avg_score, 1),
-            'Current Score': latest['skor_evaluasi'],
-            'Status': status,
-            'BPJS TK': f"{latest['bpjs_tk']}%",
-            'BPJS KES': f"{latest['bpjs_kes']}%"
-        })
-    summary_df = pd.DataFrame(summary_data)
-    
-    display_df = df.copy()
-    display_df['bulan'] = display_df['bulan'].dt.strftime('%B %Y')
-    display_df = display_df.rename(columns={
-        'vendor': 'Vendor',
-        'bulan': 'Month',
-        'skor_evaluasi': 'Score',
-        'jumlah_pekerja': 'Workers',
-        'waktu_thp': 'THP %',
-        'kehadiran': 'Attendance %',
-        'thr': 'THR %',
-        'bpjs_tk': 'BPJS TK %',
-        'bpjs_kes': 'BPJS KES %',
-        'dpslk': 'DPSLK %'
-    })
+    _, summary_df = load_vendor_summary(data_version, risk_thresholds, store)
     
     tab1, tab2 = st.tabs(["View Data", "Export"])
     
@@ -835,7 +1675,17 @@ elif page == "Laporan":
         st.markdown("<br>", unsafe_allow_html=True)
         
         def detail_table():
-            st.dataframe(display_df, use_container_width=True, hide_index=True, height=400)
+            # Only the visible page is fetched, which for a SQLite dataset is one indexed query
+            pages = page_count(len(store), DETAIL_PAGE_SIZE)
+            page_number = 1
+            if pages > 1:
+                if st.session_state.get('detail_page', 1) > pages:
+                    st.session_state['detail_page'] = pages
+                page_number = st.number_input(f"Page (of {pages}, {DETAIL_PAGE_SIZE} rows each)",
+                                              min_value=1, max_value=pages, step=1, key="detail_page")
+            display_df = store.page(page_number, DETAIL_PAGE_SIZE).rename(columns=DISPLAY_COLUMNS)
+            st.dataframe(display_df, use_container_width=True, hide_index=True, height=400,
+                         column_config={'Month': st.column_config.DateColumn(format="MMMM YYYY")})
         render_chart(
             "Monthly Detail Data",
             "Granular breakdown by vendor and month – drill down for actionable insights",
@@ -845,31 +1695,25 @@ elif page == "Laporan":
     with tab2:
         col1, col2 = st.columns(2)
         with col1:
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                summary_df.to_excel(writer, index=False, sheet_name='Summary')
-            summary_excel = output.getvalue()
             st.download_button(
                 label="Download Summary Excel",
-                data=summary_excel,
+                data=lambda: export_file(data_version, 'summary', risk_thresholds, store).read_bytes(),
                 file_name='vendor_summary.xlsx',
-                mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                mime=EXCEL_MIME,
                 use_container_width=True
             )
         with col2:
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                display_df.to_excel(writer, index=False, sheet_name='Details')
-            detail_excel = output.getvalue()
             st.download_button(
                 label="Download Detail Excel",
-                data=detail_excel,
+                data=lambda: export_file(data_version, 'detail', risk_thresholds, store).read_bytes(),
                 file_name='vendor_detail.xlsx',
-                mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                mime=EXCEL_MIME,
                 use_container_width=True
             )
 
-elif page == "Settings":
+@st.fragment
+@traced("page:Settings")
+def render_settings():
     tab1, tab2 = st.tabs(["Upload Data", "Preferences"])
     
     with tab1:
@@ -880,23 +1724,51 @@ elif page == "Settings":
             - Date format: YYYY-MM-DD
             - Score values: 0-100
             """)
+            if st.session_state.pop('upload_success', False):
+                st.success("Data successfully uploaded!")
+                st.balloons()
+            updated_vendors = st.session_state.pop('upsert_vendors', None)
+            if updated_vendors is not None:
+                st.success(f"Dataset updated: {updated_vendors} vendor(s) merged and recomputed.")
+            upload_mode = st.radio("Upload mode", ["Replace dataset", "Add or update months"], horizontal=True,
+                                   key="upload_mode",
+                                   help="Add or update months merges the file into the active dataset on "
+                                        "(vendor, bulan); only the vendors it contains are recomputed.")
             uploaded_file = st.file_uploader("Choose Excel file", type=['xlsx', 'xls'])
             if uploaded_file is not None:
                 try:
-                    uploaded_df = pd.read_excel(uploaded_file)
+                    progress_slot = st.empty()
+                    def show_progress(done, total):
+                        fraction = min(done / total, 1.0) if total else 0.0
+                        progress_slot.progress(fraction, text=f"Reading rows... {done:,} / {total:,}")
+                    upload_hash, uploaded_df, stats = ingest_upload(uploaded_file.getvalue(), show_progress)
+                    progress_slot.empty()
                     st.markdown("#### Data Preview")
                     st.dataframe(uploaded_df.head(10), use_container_width=True, hide_index=True)
                     col1, col2, col3, col4 = st.columns(4)
-                    with col1: st.metric("Rows", len(uploaded_df))
-                    with col2: st.metric("Columns", len(uploaded_df.columns))
-                    with col3: st.metric("Vendors", uploaded_df['vendor'].nunique() if 'vendor' in uploaded_df.columns else 0)
-                    with col4: st.metric("Months", uploaded_df['bulan'].nunique() if 'bulan' in uploaded_df.columns else 0)
-                    if st.button("Use This Data", type="primary"):
-                        if 'bulan' in uploaded_df.columns:
-                            uploaded_df['bulan'] = pd.to_datetime(uploaded_df['bulan'])
-                        st.session_state['uploaded_data'] = uploaded_df
-                        st.success("Data successfully uploaded!")
-                        st.balloons()
+                    with col1: st.metric("Rows", stats['rows'])
+                    with col2: st.metric("Columns", stats['columns'])
+                    with col3: st.metric("Vendors", stats['vendors'])
+                    with col4: st.metric("Months", stats['months'])
+                    if upload_mode == "Add or update months":
+                        if st.button("Merge Into Current Data", type="primary"):
+                            st.session_state['upsert_vendors'] = apply_upsert(uploaded_df, uploaded_file.name,
+                                                                              data_version, store)
+                            st.rerun()
+                    elif st.button("Use This Data", type="primary"):
+                        if 'dataset' in st.session_state:
+                            st.session_state.pop('dataset').release()
+                        st.session_state.pop('db_dataset', None)
+                        if sqlite_store() is not None:
+                            # Content-addressed: a file stored before is already there as is
+                            if sqlite_store().data_version(upload_hash) is None:
+                                sqlite_store().save_dataset(upload_hash, uploaded_file.name, uploaded_df)
+                            st.session_state['db_dataset'] = upload_hash
+                        else:
+                            st.session_state['dataset'] = dataset_registry().acquire(upload_hash)
+                        # Everything outside this panel depends on the dataset, so rerun the whole app
+                        st.session_state['upload_success'] = True
+                        st.rerun()
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
         render_chart(
@@ -907,9 +1779,51 @@ elif page == "Settings":
         
         st.markdown("<br>", unsafe_allow_html=True)
         
+        if sqlite_store() is not None:
+            def stored_section():
+                stored = sqlite_store().datasets()
+                if stored.empty:
+                    st.caption("No datasets stored yet; uploaded data is saved here when used.")
+                    return
+                st.dataframe(stored, use_container_width=True, hide_index=True)
+                dataset_id = st.selectbox("Dataset", stored['dataset_id'], key="stored_dataset",
+                                          format_func=lambda i: stored.set_index('dataset_id').at[i, 'name'])
+                if st.button("Load Stored Dataset"):
+                    if 'dataset' in st.session_state:
+                        st.session_state.pop('dataset').release()
+                    st.session_state['db_dataset'] = dataset_id
+                    st.rerun()
+            render_chart(
+                "Stored Datasets",
+                f"Datasets persisted in {DATABASE_PATH}",
+                stored_section
+            )
+            
+            st.markdown("<br>", unsafe_allow_html=True)
+        
+        def memory_section():
+            if dataset_memory is None:
+                st.info("The active dataset is stored in SQLite; pages query only the rows they show.")
+                return
+            before = dataset_memory['Before (KiB)'].sum()
+            after = dataset_memory['After (KiB)'].sum()
+            col1, col2, col3 = st.columns(3)
+            with col1: st.metric("Before", f"{before:,.1f} KiB")
+            with col2: st.metric("After", f"{after:,.1f} KiB")
+            with col3: st.metric("Reduction", f"{before / after:.1f}x" if after else "-")
+            st.dataframe(dataset_memory, use_container_width=True, hide_index=True)
+        render_chart(
+            "Dataset Memory",
+            "Per-column memory of the active dataset before and after dtype normalization",
+            memory_section
+        )
+        
+        st.markdown("<br>", unsafe_allow_html=True)
+        
         if st.button("Reset to Default Data"):
-            if 'uploaded_data' in st.session_state:
-                del st.session_state['uploaded_data']
+            if 'dataset' in st.session_state:
+                st.session_state.pop('dataset').release()
+            st.session_state.pop('db_dataset', None)
             st.success("Data reset to default!")
             st.rerun()
 
@@ -923,6 +1837,18 @@ elif page == "Settings":
                     st.session_state['dark_mode'] = dark_mode_checkbox
                     st.rerun()
                 st.checkbox("Chart animations", value=True)
+                num_workers_input = st.number_input("Workers per vendor", min_value=1, max_value=50000, step=50,
+                                                    value=st.session_state['num_workers'], key="num_workers_input")
+                st.session_state['num_workers'] = int(num_workers_input)
+                low_default, medium_default = st.session_state['risk_thresholds']
+                low_from = st.number_input("Low Risk from score", min_value=1, max_value=100, step=1,
+                                           value=low_default, key="risk_low_input")
+                medium_from = st.number_input("Medium Risk from score", min_value=0, max_value=99, step=1,
+                                              value=medium_default, key="risk_medium_input")
+                if medium_from < low_from:
+                    st.session_state['risk_thresholds'] = (int(low_from), int(medium_from))
+                else:
+                    st.error("The Medium Risk threshold must be below the Low Risk threshold.")
             with col2:
                 st.markdown(f"**<span style='color: {text_primary};'>Notifications</span>**", unsafe_allow_html=True)
                 st.checkbox("Weekly email report", value=False)
@@ -966,4 +1892,34 @@ elif page == "Settings":
                 </div>
             </div>
         </div>
-        """, unsafe_allow_html=True)
\ No newline at end of file
+        """, unsafe_allow_html=True)
+
+    # Hidden unless the page is opened with ?debug=1
+    if st.query_params.get("debug") == "1":
+        st.markdown("<br>", unsafe_allow_html=True)
+        
+        def debug_section():
+            recorder = perf_recorder()
+            st.markdown("**Timings** (this process, last 1000 samples per span)")
+            st.dataframe(recorder.span_stats(), use_container_width=True, hide_index=True)
+            st.markdown("**Data caches**")
+            st.dataframe(recorder.cache_stats(), use_container_width=True, hide_index=True)
+            st.caption(f"Rerun log: {recorder.jsonl_path} · Prometheus: {recorder.prometheus_path}")
+        render_chart(
+            "Debug: Performance",
+            "Rerun, page and panel timings with cache hit rates for this server process",
+            debug_section
+        )
+
+# Page dispatch: each renderer is a fragment, so widgets on a page rerun only that page
+PAGE_RENDERERS = {
+    "Dashboard": render_dashboard,
+    "Multi Vendor": render_multi_vendor,
+    "Prediksi": render_predictions,
+    "Pekerja": render_workers,
+    "Laporan": render_reports,
+    "Settings": render_settings,
+}
+
+PAGE_RENDERERS[page]()
+perf.end()
@@ -0,0 +1,104 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import vendor_core as core
+
+def set_times(path, accessed=None, modified=None):
+    stat = path.stat()
+    os.utime(path, (accessed or stat.st_atime, modified or stat.st_mtime))
+
+def counting(value):
+    calls = []
+
+    def compute():
+        calls.append(value)
+        return value
+    return compute, calls
+
+def test_get_or_compute_reuses_the_stored_value(tmp_path):
+    cache = core.DiskCache(tmp_path)
+    compute, calls = counting({'rows': [1, 2, 3]})
+    assert cache.get_or_compute('summary', 'v1', (1,), compute) == {'rows': [1, 2, 3]}
+    assert cache.get_or_compute('summary', 'v1', (1,), compute) == {'rows': [1, 2, 3]}
+    assert len(calls) == 1
+    # Another instance on the same directory, as in another process, sees it too
+    assert core.DiskCache(tmp_path).get_or_compute('summary', 'v1', (1,), compute) == {'rows': [1, 2, 3]}
+    assert len(calls) == 1
+
+def test_keys_include_fingerprint_and_params(tmp_path):
+    cache = core.DiskCache(tmp_path)
+    paths = {cache.path('summary', 'v1', (1,)), cache.path('summary', 'v2', (1,)),
+             cache.path('summary', 'v1', (2,)), cache.path('forecasts', 'v1', (1,))}
+    assert len(paths) == 4
+
+def test_expired_entries_are_recomputed(tmp_path):
+    cache = core.DiskCache(tmp_path, ttl=60)
+    compute, calls = counting('value')
+    cache.get_or_compute('summary', 'v1', (), compute)
+    set_times(cache.path('summary', 'v1'), modified=time.time() - 120)
+    cache.get_or_compute('summary', 'v1', (), compute)
+    assert len(calls) == 2
+
+def test_evict_drops_expired_entries(tmp_path):
+    cache = core.DiskCache(tmp_path, ttl=60)
+    cache.get_or_compute('summary', 'old', (), lambda: 'old')
+    cache.get_or_compute('summary', 'new', (), lambda: 'new')
+    set_times(cache.path('summary', 'old'), modified=time.time() - 120)
+    cache.evict()
+    assert not cache.path('summary', 'old').exists()
+    assert cache.path('summary', 'new').exists()
+
+def test_evict_removes_least_recently_used_first(tmp_path):
+    cache = core.DiskCache(tmp_path)
+    payload = b'x' * 10_000
+    for name in ['a', 'b', 'c']:
+        cache.get_or_compute('blob', name, (), lambda: payload)
+    size = cache.path('blob', 'a').stat().st_size
+    now = time.time()
+    # 'b' was used longest ago, then 'a'; 'c' is inside the grace period
+    set_times(cache.path('blob', 'a'), accessed=now - 200)
+    set_times(cache.path('blob', 'b'), accessed=now - 300)
+    cache.max_bytes = 2 * size
+    cache.evict()
+    assert not cache.path('blob', 'b').exists()
+    assert cache.path('blob', 'a').exists()
+    assert cache.path('blob', 'c').exists()
+
+def test_evict_keeps_recently_used_entries_over_budget(tmp_path):
+    cache = core.DiskCache(tmp_path, max_bytes=1)
+    cache.get_or_compute('blob', 'a', (), lambda: b'x' * 10_000)
+    cache.evict()
+    assert cache.path('blob', 'a').exists()
+
+def test_file_rewrites_a_deleted_entry(tmp_path):
+    cache = core.DiskCache(tmp_path)
+    writes = []
+
+    def write(f):
+        writes.append(1)
+        f.write(b'content')
+    path = cache.file('export', 'v1', ('detail',), write)
+    path.unlink()
+    assert cache.file('export', 'v1', ('detail',), write).read_bytes() == b'content'
+    assert len(writes) == 2
+
+def read_and_write(directory, worker):
+    # Every worker reads, writes and evicts the same keys through a cache too small for
+    # them all; runs in a pool process, so dropping the grace period stays local to it
+    core.EVICT_GRACE_S = 0
+    cache = core.DiskCache(directory, max_bytes=50_000)
+    for i in range(200):
+        key = i % 20
+        value = cache.get_or_compute('blob', key, (), lambda: bytes([key]) * 5_000)
+        if value != bytes([key]) * 5_000:
+            return False
+        if i % 10 == worker:
+            cache.evict()
+    return True
+
+def test_processes_sharing_a_directory_only_see_whole_entries(tmp_path):
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(read_and_write, [tmp_path] * 4, range(4)))
+    assert all(results)
+    assert not list(tmp_path.glob('*/*.tmp'))
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+import vendor_core as core
+
+@pytest.mark.parametrize('thresholds', [core.DEFAULT_RISK_THRESHOLDS, (90, 75), (60, 60)])
+def test_classify_risk_agrees_with_get_risk_status(thresholds):
+    # Every integer score, the band edges as floats, and values outside 0-100
+    scores = np.concatenate([np.arange(0, 101), np.array(thresholds, dtype=float) - 0.5, [-1, 150.5]])
+    risk, colors = core.risk_status_arrays(scores, thresholds)
+    expected = [core.get_risk_status(score, thresholds) for score in scores]
+    assert list(risk) == [level for level, _ in expected]
+    assert list(colors) == [color for _, color in expected]
+
+def test_classify_risk_band_edges():
+    low_from, medium_from = core.DEFAULT_RISK_THRESHOLDS
+    risk = core.classify_risk([low_from, low_from - 1, medium_from, medium_from - 1])
+    assert list(risk) == [core.RISK_LEVELS[0], core.RISK_LEVELS[1], core.RISK_LEVELS[1], core.RISK_LEVELS[2]]
+    assert list(risk.categories) == list(core.RISK_LEVELS)
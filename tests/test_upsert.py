@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import vendor_core as core
+
+FORECAST_FIELDS = ['months', 'scores', 'lower', 'upper', 'confidence', 'valid']
+
+@pytest.fixture
+def base():
+    return core.normalize_dataset(core.generate_vendor_data(30, 12))
+
+@pytest.fixture
+def delta():
+    # Next month for 32 vendors (two of them new) plus a revision of the first month for five
+    full = core.normalize_dataset(core.generate_vendor_data(32, 13, seed=7)).astype({'vendor': str})
+    next_month = full[full['bulan'] == full['bulan'].max()]
+    revised = full[(full['bulan'] == full['bulan'].min()) & full['vendor'].isin(core.vendor_names(5))]
+    return core.normalize_dataset(pd.concat([next_month, revised], ignore_index=True))
+
+def assert_same_summary(incremental, full):
+    pd.testing.assert_frame_equal(incremental.reset_index(drop=True), full.reset_index(drop=True))
+
+def assert_same_forecasts(incremental, full):
+    assert list(incremental.vendors) == list(full.vendors)
+    for name in FORECAST_FIELDS:
+        np.testing.assert_array_equal(getattr(incremental, name), getattr(full, name), err_msg=name)
+
+def test_upsert_frame_replaces_rows_on_vendor_and_month(base, delta):
+    merged, vendors = core.upsert_frame(base, delta)
+    assert sorted(vendors) == sorted(delta['vendor'].astype(str).unique())
+    assert not merged.duplicated(['vendor', 'bulan']).any()
+    assert len(merged) == len(base) + 32
+    revised = delta[delta['bulan'] == base['bulan'].min()].iloc[0]
+    row = merged[(merged['vendor'] == revised['vendor']) & (merged['bulan'] == revised['bulan'])].iloc[0]
+    assert row['skor_evaluasi'] == revised['skor_evaluasi']
+
+@pytest.mark.parametrize('num_vendors', [32, 10])
+def test_incremental_update_matches_full_rebuild(base, delta, num_vendors):
+    delta = delta[delta['vendor'].isin(core.vendor_names(num_vendors))]
+    store = core.VendorStore(base)
+    summary, forecasts = core.build_vendor_summary(store), core.forecast_scores(store)
+    merged, vendors = core.upsert_frame(base, delta)
+    new_store = core.VendorStore(merged)
+
+    assert_same_summary(core.update_vendor_summary(summary, new_store, vendors), core.build_vendor_summary(new_store))
+    assert_same_forecasts(core.update_forecasts(forecasts, new_store, vendors), core.forecast_scores(new_store))
+
+def test_sqlite_upsert_matches_full_rebuild(tmp_path, base, delta):
+    db = core.SqliteStore(tmp_path / 'vendorpro.db')
+    db.save_dataset('base', 'base.xlsx', base)
+    source_version = db.data_version('base')
+    store = core.SqlVendorStore(db, 'base')
+    summary, forecasts = core.build_vendor_summary(store), core.forecast_scores(store)
+
+    dataset_id, merged_into, vendors = db.upsert('base', 'delta.xlsx', delta)
+    new_store = core.SqlVendorStore(db, dataset_id)
+    expected = core.VendorStore(core.upsert_frame(base, delta)[0])
+
+    assert merged_into == source_version
+    assert new_store.vendors == list(expected.vendors)
+    assert len(new_store) == len(expected)
+    assert_same_summary(core.update_vendor_summary(summary, new_store, vendors), core.build_vendor_summary(expected))
+    assert_same_forecasts(core.update_forecasts(forecasts, new_store, vendors), core.forecast_scores(expected))
+
+def test_sqlite_upsert_leaves_the_source_dataset_unchanged(tmp_path, base, delta):
+    db = core.SqliteStore(tmp_path / 'vendorpro.db')
+    db.save_dataset('base', 'base.xlsx', base)
+    source_version = db.data_version('base')
+
+    dataset_id, _, _ = db.upsert('base', 'delta.xlsx', delta)
+    assert dataset_id != 'base'
+    assert db.data_version('base') == source_version
+    assert len(core.SqlVendorStore(db, 'base')) == len(base)
+    # The same merge again is stored once
+    assert db.upsert('base', 'delta.xlsx', delta)[0] == dataset_id
+    assert len(db.datasets()) == 2
@@ -0,0 +1,922 @@
+import contextlib
+import hashlib
+import io
+import os
+import pickle
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import openpyxl
+
+# Mock data generators
+VENDOR_NAMES = ["PT PMS", "PT KARYA JAYA", "PT MANDIRI SEJAHTERA",
+                "PT SUKSES BERSAMA", "PT MAKMUR ABADI", "PT MITRA USAHA"]
+
+# (column, low, high) - high is exclusive, same as np.random.randint
+METRIC_RANGES = [
+    ('jumlah_pekerja', 80, 150),
+    ('waktu_thp', 85, 100),
+    ('kehadiran', 85, 100),
+    ('thr', 80, 100),
+    ('bpjs_tk', 75, 100),
+    ('bpjs_kes', 75, 100),
+    ('dpslk', 70, 100),
+]
+
+def vendor_names(num_vendors):
+    names = VENDOR_NAMES[:num_vendors]
+    names += [f"PT VENDOR {i+1:05d}" for i in range(len(names), num_vendors)]
+    return names
+
+def build_vendor_frame(num_vendors, num_months, rng, start='2023-06-01'):
+    # Columnar generator: every column is drawn for all vendor x month rows at once
+    vendors = np.array(vendor_names(num_vendors), dtype=object)
+    months = pd.date_range(start, periods=num_months, freq='MS')
+    n_rows = num_vendors * num_months
+
+    base_score = rng.integers(75, 90, size=num_vendors)
+    score = base_score[:, None] + rng.integers(-5, 8, size=(num_vendors, num_months))
+
+    data = {
+        'vendor': np.repeat(vendors, num_months),
+        'bulan': np.tile(months.values, num_vendors),
+        'skor_evaluasi': np.clip(score, 60, 100).ravel(),
+    }
+    for column, low, high in METRIC_RANGES:
+        data[column] = rng.integers(low, high, size=n_rows)
+    return pd.DataFrame(data)
+
+def generate_vendor_data(num_vendors=6, num_months=3, seed=42):
+    return build_vendor_frame(num_vendors, num_months, np.random.default_rng(seed))
+
+DEFAULT_NUM_WORKERS = 10
+WORKER_SCORE_RANGE = (70, 100)
+
+def worker_seed(vendor, month):
+    # hash() of a str is salted per process, so derive the seed from a stable digest instead
+    key = f"{vendor}|{pd.Timestamp(month):%Y-%m}".encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little')
+
+def generate_worker_data(vendor, month, num_workers=DEFAULT_NUM_WORKERS):
+    rng = np.random.default_rng(worker_seed(vendor, month))
+    workers = [f"Pekerja {i+1}" for i in range(num_workers)]
+    scores = rng.integers(*WORKER_SCORE_RANGE, num_workers)
+    return pd.DataFrame({'pekerja': workers, 'skor': scores})
+
+# Large workforces: nothing below sorts or ships the whole worker table
+WORKER_PAGE_SIZE = 500
+HISTOGRAM_BINS = 10
+
+def top_workers(worker_df, k=10):
+    # Partial selection finds the k-th best score in O(n); only workers at or above it
+    # are sorted, ties in list order like a stable sort
+    scores = worker_df['skor'].values
+    if len(scores) > k:
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(len(scores))
+    order = candidates[np.lexsort((candidates, -scores[candidates]))][:k]
+    return worker_df.iloc[order]
+
+def score_histogram(scores, bins=HISTOGRAM_BINS, score_range=WORKER_SCORE_RANGE):
+    # Bin counts and edges, so a chart only needs `bins` numbers whatever the headcount
+    return np.histogram(np.asarray(scores), bins=bins, range=score_range)
+
+def page_count(num_rows, page_size=WORKER_PAGE_SIZE):
+    return max(1, -(-num_rows // page_size))
+
+def page_rows(frame, page, page_size=WORKER_PAGE_SIZE):
+    start = (page - 1) * page_size
+    return frame.iloc[start:start + page_size]
+
+def dataset_fingerprint(df):
+    row_hashes = pd.util.hash_pandas_object(df, index=False).values
+    return hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
+
+# Compact dtypes: every metric is a 0-100 percentage or a headcount
+METRIC_COLUMNS = ['skor_evaluasi'] + [column for column, _, _ in METRIC_RANGES]
+INT_DTYPES = ['uint8', 'int16', 'int32']
+
+def downcast_metric(values):
+    if values.isna().any() or not (values % 1 == 0).all():
+        return values.astype('float32')
+    low, high = values.min(), values.max()
+    for dtype in INT_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return values.astype(dtype)
+    return values.astype('int64')
+
+def normalize_dataset(df):
+    columns = {}
+    for name, values in df.items():
+        if name == 'vendor':
+            values = values.astype('category')
+        elif name == 'bulan':
+            values = pd.to_datetime(values)
+        elif name in METRIC_COLUMNS and pd.api.types.is_numeric_dtype(values):
+            values = downcast_metric(values)
+        columns[name] = values
+    return pd.DataFrame(columns)
+
+REQUIRED_COLUMNS = ['vendor', 'bulan'] + METRIC_COLUMNS
+
+def validate_dataset(df):
+    # Every page assumes these columns and at least one row; reject anything else up front
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    if df.empty:
+        raise ValueError("The sheet has no data rows")
+    non_numeric = [column for column in METRIC_COLUMNS if not pd.api.types.is_numeric_dtype(df[column])]
+    if non_numeric:
+        raise ValueError(f"Non-numeric columns: {', '.join(non_numeric)}")
+
+def memory_report(before, after):
+    return pd.DataFrame({
+        'Column': before.columns,
+        'Type Before': before.dtypes.astype(str).values,
+        'Type After': after.dtypes.astype(str).values,
+        'Before (KiB)': (before.memory_usage(index=False, deep=True) / 1024).round(1).values,
+        'After (KiB)': (after.memory_usage(index=False, deep=True) / 1024).round(1).values,
+    })
+
+class VendorStore:
+    # Read-only view of a dataset, sorted by (vendor, bulan) with per-vendor row offsets.
+    # Instances are shared across sessions through st.cache_resource, so never mutate them.
+    def __init__(self, df):
+        codes, vendors = pd.factorize(df['vendor'])
+        order = np.lexsort((df['bulan'].values, codes))
+        self.df = df.iloc[order].reset_index(drop=True)
+        self.vendors = list(vendors)
+
+        sorted_codes = codes[order]
+        self._codes = sorted_codes
+        vendor_ids = np.arange(len(self.vendors))
+        self._starts = np.searchsorted(sorted_codes, vendor_ids, side='left')
+        self._ends = np.searchsorted(sorted_codes, vendor_ids, side='right')
+        self._offsets = {vendor: i for i, vendor in enumerate(self.vendors)}
+        self._bulan = self.df['bulan'].values
+
+        self.months = pd.DatetimeIndex(np.unique(self._bulan))
+        self.month_labels = list(self.months.strftime('%B %Y'))
+        self._latest = self.df.iloc[self._ends - 1].set_index('vendor', drop=False)
+
+    def __len__(self):
+        return len(self.df)
+
+    def _bounds(self, vendor):
+        i = self._offsets[vendor]
+        return self._starts[i], self._ends[i]
+
+    def series(self, vendor):
+        start, end = self._bounds(vendor)
+        return self.df.iloc[start:end]
+
+    def row(self, vendor, month):
+        start, end = self._bounds(vendor)
+        month = pd.Timestamp(month).to_datetime64()
+        pos = start + np.searchsorted(self._bulan[start:end], month)
+        if pos < end and self._bulan[pos] == month:
+            return self.df.iloc[pos]
+        return None
+
+    def latest(self):
+        return self._latest
+
+    def vendor_means(self, column):
+        sums = np.add.reduceat(self.df[column].values.astype(float), self._starts)
+        return sums / (self._ends - self._starts)
+
+    def matrix(self, column):
+        # vendor x month grid of `column`, NaN where a vendor has no row for that month
+        grid = np.full((len(self.vendors), len(self.months)), np.nan)
+        month_pos = np.searchsorted(self.months.values, self._bulan)
+        grid[self._codes, month_pos] = self.df[column].values
+        return grid
+
+    def month_rows(self, month):
+        return self.df[self._bulan == pd.Timestamp(month).to_datetime64()]
+
+    def subset(self, vendors):
+        # In-memory store of just these vendors' rows
+        codes = [self._offsets[vendor] for vendor in vendors if vendor in self._offsets]
+        return VendorStore(self.df[np.isin(self._codes, codes)])
+
+    def page(self, page, page_size):
+        return page_rows(self.df, page, page_size)
+
+    def iter_chunks(self, chunk_rows):
+        for start in range(0, len(self.df), chunk_rows):
+            yield self.df.iloc[start:start + chunk_rows]
+
+FORECAST_Z = 1.96  # two-sided 95% prediction interval
+
+class ForecastSet:
+    # Forecasts for every vendor of one dataset version, stored as vendor x horizon arrays
+    def __init__(self, vendors, months, scores, lower, upper, confidence, valid):
+        self.vendors = vendors
+        self.months = months
+        self.scores = scores
+        self.lower = lower
+        self.upper = upper
+        self.confidence = confidence
+        self.valid = valid
+        self._offsets = {vendor: i for i, vendor in enumerate(vendors)}
+
+    def for_vendor(self, vendor):
+        i = self._offsets[vendor]
+        if not self.valid[i]:
+            return []
+        return [
+            {
+                'bulan': pd.Timestamp(self.months[i, step]),
+                'skor_prediksi': int(self.scores[i, step]),
+                'lower': float(self.lower[i, step]),
+                'upper': float(self.upper[i, step]),
+                'confidence': int(self.confidence[i]),
+            }
+            for step in range(self.scores.shape[1])
+        ]
+
+def forecast_scores(store, horizon=3):
+    # Ordinary least squares trend per vendor, fitted for all vendors at once on the
+    # vendor x month score matrix. Missing months are masked out of every sum.
+    y = store.matrix('skor_evaluasi')
+    observed = ~np.isnan(y)
+    month_index = store.months.values.astype('datetime64[M]')
+    x = (month_index - month_index[0]).astype(float) if len(month_index) else np.zeros(0)
+
+    n = observed.sum(axis=1)
+    valid = n >= 2
+    n_safe = np.maximum(n, 1)
+    x_mean = np.where(observed, x, 0).sum(axis=1) / n_safe
+    y_mean = np.where(observed, y, 0).sum(axis=1) / n_safe
+    dx = np.where(observed, x - x_mean[:, None], 0)
+    dy = np.where(observed, y - y_mean[:, None], 0)
+    sxx = (dx ** 2).sum(axis=1)
+    slope = np.divide((dx * dy).sum(axis=1), sxx, out=np.zeros_like(sxx), where=sxx > 0)
+    intercept = y_mean - slope * x_mean
+
+    residuals = np.where(observed, y - (intercept[:, None] + slope[:, None] * x), 0)
+    dof = n - 2
+    variance = (dy ** 2).sum(axis=1) / n_safe
+    resid_var = np.divide((residuals ** 2).sum(axis=1), dof, out=variance.copy(), where=dof > 0)
+
+    last_pos = y.shape[1] - 1 - np.argmax(observed[:, ::-1], axis=1) if y.shape[1] else np.zeros(len(n), int)
+    x_last = x[last_pos] if len(x) else np.zeros(len(n))
+    steps = np.arange(1, horizon + 1)
+    x_new = x_last[:, None] + steps
+    predicted = intercept[:, None] + slope[:, None] * x_new
+
+    leverage = np.divide((x_new - x_mean[:, None]) ** 2, sxx[:, None],
+                         out=np.zeros_like(x_new, dtype=float), where=sxx[:, None] > 0)
+    std_err = np.sqrt(resid_var[:, None] * (1 + 1 / n_safe[:, None] + leverage))
+
+    if len(month_index):
+        months = (month_index[last_pos][:, None] + steps).astype('datetime64[ns]')
+    else:
+        months = np.empty((0, horizon), dtype='datetime64[ns]')
+    return ForecastSet(
+        vendors=store.vendors,
+        months=months,
+        scores=np.clip(np.round(predicted), 60, 100).astype(int),
+        lower=np.clip(predicted - FORECAST_Z * std_err, 0, 100),
+        upper=np.clip(predicted + FORECAST_Z * std_err, 0, 100),
+        confidence=np.clip(90 - variance, 70, 95).astype(int),
+        valid=valid,
+    )
+
+def update_forecasts(forecasts, store, vendors, horizon=3):
+    # Refits only `vendors`; a vendor's fit depends on its own series alone, so every
+    # other vendor's forecast carries over unchanged
+    fresh = forecast_scores(store.subset(vendors), horizon)
+    use_fresh = np.array([vendor in fresh._offsets for vendor in store.vendors], dtype=bool)
+    fresh_pos = np.array([fresh._offsets.get(vendor, 0) for vendor in store.vendors], dtype=int)
+    old_pos = np.array([forecasts._offsets.get(vendor, 0) for vendor in store.vendors], dtype=int)
+    index = np.where(use_fresh, len(forecasts.vendors) + fresh_pos, old_pos)
+
+    def pick(name):
+        return np.concatenate([getattr(forecasts, name), getattr(fresh, name)])[index]
+
+    return ForecastSet(
+        vendors=store.vendors,
+        months=pick('months'),
+        scores=pick('scores'),
+        lower=pick('lower'),
+        upper=pick('upper'),
+        confidence=pick('confidence'),
+        valid=pick('valid'),
+    )
+
+def predict_future_scores(store, vendor, months=3):
+    # Fits only this vendor's series; use forecast_scores() when every vendor is needed
+    return forecast_scores(VendorStore(store.series(vendor)), months).for_vendor(vendor)
+
+# Drawing many series: LTTB downsampling and top-N + percentile band aggregation
+def lttb_indices(x, y, threshold):
+    # Largest-Triangle-Three-Buckets: keeps the first and last point plus, per bucket,
+    # the point spanning the largest triangle with the previous pick and the next
+    # bucket's mean. Returns the positions to keep, in order.
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def top_vendor_indices(store, n, column='skor_evaluasi'):
+    # Positions in store.vendors of the n best vendors by average `column`, best first
+    means = store.vendor_means(column)
+    if len(means) > n:
+        candidates = np.argpartition(-means, n - 1)[:n]
+    else:
+        candidates = np.arange(len(means))
+    return candidates[np.lexsort((candidates, -means[candidates]))]
+
+def percentile_band(matrix, percentiles=(10, 50, 90)):
+    # Per-month percentiles across the rows of a vendor x month matrix; NaN where a
+    # month has no data
+    observed = ~np.isnan(matrix).all(axis=0)
+    band = np.full((len(percentiles), matrix.shape[1]), np.nan)
+    if observed.any():
+        band[:, observed] = np.nanpercentile(matrix[:, observed], percentiles, axis=0)
+    return band
+
+RISK_LEVELS = ["Low Risk", "Medium Risk", "High Risk"]
+RISK_COLORS = np.array(["#10b981", "#f59e0b", "#ef4444"])
+RISK_DTYPE = pd.CategoricalDtype(RISK_LEVELS)
+DEFAULT_RISK_THRESHOLDS = (85, 70)  # lowest score that is Low Risk, lowest that is Medium Risk
+
+def upsert_frame(base, delta):
+    # Rows of `delta` replace rows of `base` with the same (vendor, bulan); returns the
+    # merged frame and the vendors the delta touched
+    missing = [column for column in base.columns if column not in delta.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    delta = delta[base.columns].astype({'vendor': str})
+    merged = pd.concat([base.astype({'vendor': str}), delta], ignore_index=True)
+    merged = merged.drop_duplicates(['vendor', 'bulan'], keep='last')
+    return normalize_dataset(merged.reset_index(drop=True)), list(pd.unique(delta['vendor']))
+
+def classify_risk(scores, thresholds=DEFAULT_RISK_THRESHOLDS):
+    # Risk band of every score at once, as a categorical over RISK_LEVELS
+    low_from, medium_from = thresholds
+    scores = np.asarray(scores, dtype=float)
+    codes = np.where(scores >= low_from, 0, np.where(scores >= medium_from, 1, 2))
+    return pd.Categorical.from_codes(codes, dtype=RISK_DTYPE)
+
+def risk_colors(risk):
+    return RISK_COLORS[np.asarray(risk.codes)]
+
+def risk_status_arrays(scores, thresholds=DEFAULT_RISK_THRESHOLDS):
+    risk = classify_risk(scores, thresholds)
+    return risk, risk_colors(risk)
+
+def get_risk_status(score, thresholds=DEFAULT_RISK_THRESHOLDS):
+    # Scalar form of classify_risk for single values
+    low_from, medium_from = thresholds
+    band = 0 if score >= low_from else 1 if score >= medium_from else 2
+    return RISK_LEVELS[band], str(RISK_COLORS[band])
+
+def risk_distribution(months, risk):
+    # Vendors per risk band per month, as one bincount over (month, band) codes
+    month_codes, month_index = pd.factorize(np.asarray(months), sort=True)
+    cells = month_codes * len(RISK_LEVELS) + np.asarray(risk.codes)
+    counts = np.bincount(cells, minlength=len(month_index) * len(RISK_LEVELS))
+    return pd.DataFrame(counts.reshape(-1, len(RISK_LEVELS)), index=pd.Index(month_index, name='bulan'),
+                        columns=RISK_LEVELS)
+
+def build_vendor_summary(store, thresholds=DEFAULT_RISK_THRESHOLDS):
+    # One row per vendor: latest month's values plus the all-time average score
+    latest = store.latest()
+    summary = pd.DataFrame({
+        'vendor': store.vendors,
+        'jumlah_pekerja': latest['jumlah_pekerja'].values,
+        'avg_score': store.vendor_means('skor_evaluasi').round(1),
+        'skor_evaluasi': latest['skor_evaluasi'].values,
+        'bpjs_tk': latest['bpjs_tk'].values,
+        'bpjs_kes': latest['bpjs_kes'].values,
+    })
+    return classify_summary(summary, thresholds)
+
+def classify_summary(summary, thresholds=DEFAULT_RISK_THRESHOLDS):
+    # (Re)derives the risk columns of a summary; cheap enough to redo whole for new thresholds
+    status = classify_risk(summary['avg_score'].values, thresholds)
+    current_status = classify_risk(summary['skor_evaluasi'].values, thresholds)
+    summary = summary.drop(columns=['status', 'current_status', 'current_color'], errors='ignore')
+    summary.insert(4, 'status', status)
+    summary.insert(5, 'current_status', current_status)
+    summary.insert(6, 'current_color', risk_colors(current_status))
+    return summary
+
+def filter_vendor_summary(summary, statuses=RISK_LEVELS, min_score=0, max_score=100):
+    # Vendors whose current risk band is in `statuses` and current score is within bounds
+    scores = summary['skor_evaluasi'].values
+    mask = summary['current_status'].isin(statuses).values & (scores >= min_score) & (scores <= max_score)
+    return summary[mask]
+
+def update_vendor_summary(summary, store, vendors, thresholds=DEFAULT_RISK_THRESHOLDS):
+    # Rebuilds only `vendors` from the updated store; every other row is reused
+    fresh = build_vendor_summary(store.subset(vendors), thresholds)
+    kept = summary[~summary['vendor'].isin(fresh['vendor'])]
+    merged = pd.concat([kept, fresh], ignore_index=True).set_index('vendor')
+    merged = merged.reindex(store.vendors).rename_axis('vendor').reset_index()
+    return classify_summary(merged, thresholds)
+
+def format_vendor_summary(summary):
+    return pd.DataFrame({
+        'Vendor': summary['vendor'],
+        'Total Workers': summary['jumlah_pekerja'],
+        'Avg Score': summary['avg_score'],
+        'Current Score': summary['skor_evaluasi'],
+        'Status': summary['status'],
+        'BPJS TK': summary['bpjs_tk'].astype(str) + '%',
+        'BPJS KES': summary['bpjs_kes'].astype(str) + '%',
+    })
+
+DISPLAY_COLUMNS = {
+    'vendor': 'Vendor',
+    'bulan': 'Month',
+    'skor_evaluasi': 'Score',
+    'jumlah_pekerja': 'Workers',
+    'waktu_thp': 'THP %',
+    'kehadiran': 'Attendance %',
+    'thr': 'THR %',
+    'bpjs_tk': 'BPJS TK %',
+    'bpjs_kes': 'BPJS KES %',
+    'dpslk': 'DPSLK %'
+}
+
+def to_display_frame(df):
+    display_df = df.copy()
+    display_df['bulan'] = display_df['bulan'].dt.strftime('%B %Y')
+    return display_df.rename(columns=DISPLAY_COLUMNS)
+
+# Excel exports
+EXCEL_MIME = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+EXPORT_CHUNK_ROWS = 50_000
+# Sheets with more rows than this are written with the constant-memory writer
+EXPORT_STREAMING_ROWS = 100_000
+
+def write_excel(frame, sheet_name, target):
+    with pd.ExcelWriter(target, engine='openpyxl') as writer:
+        frame.to_excel(writer, index=False, sheet_name=sheet_name)
+
+def write_excel_streaming(chunks, columns, sheet_name, target):
+    # openpyxl write-only mode flushes rows as they are appended, so memory stays
+    # bounded by one chunk no matter how many rows are exported
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append(list(columns))
+    for chunk in chunks:
+        for values in chunk.itertuples(index=False, name=None):
+            sheet.append(values)
+    workbook.save(target)
+
+def iter_display_chunks(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    for start in range(0, len(df), chunk_rows):
+        yield to_display_frame(df.iloc[start:start + chunk_rows])
+
+def build_summary_excel(summary_df, target):
+    write_excel(summary_df, 'Summary', target)
+
+def write_excel_sheets(sheets, target):
+    # {sheet name: frame} in one workbook
+    with pd.ExcelWriter(target, engine='openpyxl') as writer:
+        for sheet_name, frame in sheets.items():
+            frame.to_excel(writer, index=False, sheet_name=sheet_name)
+
+def build_vendor_report_excel(summary_row, vendor_df, target):
+    # One vendor's report: its Laporan summary row and every month of detail
+    write_excel_sheets({'Summary': summary_row, 'Details': to_display_frame(vendor_df)}, target)
+
+def build_detail_excel(df, target, streaming=None):
+    if streaming is None:
+        streaming = len(df) > EXPORT_STREAMING_ROWS
+    if streaming:
+        write_excel_streaming(iter_display_chunks(df), DISPLAY_COLUMNS.values(), 'Details', target)
+    else:
+        write_excel(to_display_frame(df), 'Details', target)
+
+# Excel upload ingestion
+UPLOAD_PROGRESS_ROWS = 5_000
+
+def content_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+def read_excel_streaming(content, progress=None):
+    # Legacy .xls files are not zip containers and cannot be opened by openpyxl
+    if not content.startswith(b'PK'):
+        return pd.read_excel(io.BytesIO(content))
+    workbook = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        total = max((sheet.max_row or 1) - 1, 0)
+        rows = sheet.iter_rows(values_only=True)
+        header = [name if name is not None else f"Unnamed: {i}" for i, name in enumerate(next(rows, ()))]
+        records = []
+        for i, values in enumerate(rows, 1):
+            if any(value is not None for value in values):
+                records.append(values)
+            if progress is not None and i % UPLOAD_PROGRESS_ROWS == 0:
+                progress(i, total)
+    finally:
+        workbook.close()
+    return pd.DataFrame.from_records(records, columns=header)
+
+# Optional SQLite persistence
+DB_COLUMNS = REQUIRED_COLUMNS
+DB_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS datasets (
+    dataset_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    updated TEXT NOT NULL,
+    fingerprint TEXT
+);
+CREATE TABLE IF NOT EXISTS vendor_months (
+    dataset_id TEXT NOT NULL,
+    vendor TEXT NOT NULL,
+    bulan TEXT NOT NULL,
+    vendor_pos INTEGER NOT NULL,
+    {', '.join(f'{column} NUMERIC' for column in METRIC_COLUMNS)},
+    PRIMARY KEY (dataset_id, vendor, bulan)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS vendor_months_by_month ON vendor_months (dataset_id, bulan);
+CREATE INDEX IF NOT EXISTS vendor_months_by_position ON vendor_months (dataset_id, vendor_pos, bulan);
+"""
+DB_SELECT = ', '.join(DB_COLUMNS)
+SQL_BATCH = 500
+
+class SqliteStore:
+    # Datasets persisted in one SQLite file, keyed by (dataset_id, vendor, bulan). Each
+    # call opens its own short-lived connection, so one instance can be shared by every
+    # session thread and several processes can use the same file; WAL lets readers
+    # carry on while a writer commits.
+    def __init__(self, path):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(DB_SCHEMA)
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(datasets)')]
+            if 'fingerprint' not in columns:
+                # Files from before fingerprints: give each dataset a random one, which can
+                # never match a cache entry written for another dataset
+                conn.execute('ALTER TABLE datasets ADD COLUMN fingerprint TEXT')
+                conn.execute('UPDATE datasets SET fingerprint = lower(hex(randomblob(16)))')
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute('PRAGMA synchronous=NORMAL')
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def query(self, sql, params=()):
+        with self._connect() as conn:
+            frame = pd.read_sql_query(sql, conn, params=params)
+        return self._decode(frame)
+
+    def _decode(self, frame):
+        if 'bulan' in frame.columns:
+            frame['bulan'] = pd.to_datetime(frame['bulan'])
+        return normalize_dataset(frame)
+
+    def scalar(self, sql, params=()):
+        with self._connect() as conn:
+            row = conn.execute(sql, params).fetchone()
+        return row[0] if row else None
+
+    def save_dataset(self, dataset_id, name, df):
+        # Replaces the dataset's rows in one transaction and bumps its version
+        codes, _ = pd.factorize(df['vendor'])
+        with self._connect() as conn:
+            conn.execute('DELETE FROM vendor_months WHERE dataset_id = ?', (dataset_id,))
+            self._insert(conn, dataset_id, df, codes)
+            self._touch(conn, dataset_id, name, dataset_fingerprint(df))
+
+    def upsert(self, source_id, name, df):
+        # Merges a delta on (vendor, bulan) into a copy of the source dataset; new vendors are
+        # appended after the existing ones. The copy is keyed by a hash chained from the
+        # source's fingerprint and the delta's, so the source never changes under the sessions
+        # reading it and the same merge is only stored once. Returns the new dataset id, the
+        # data version of the source the delta was applied to, and the affected vendors.
+        vendors = list(pd.unique(df['vendor'].astype(str)))
+        with self._connect() as conn:
+            # Take the write lock before reading, so the source read is the one merged into
+            conn.execute('BEGIN IMMEDIATE')
+            source = conn.execute('SELECT version, fingerprint FROM datasets WHERE dataset_id = ?',
+                                  (source_id,)).fetchone()
+            if source is None:
+                raise ValueError(f"Unknown dataset: {source_id}")
+            chain = f"{source[1]}|{dataset_fingerprint(df)}".encode()
+            dataset_id = fingerprint = hashlib.blake2b(chain, digest_size=16).hexdigest()
+            source_version = self._version_key(source_id, source)
+            if conn.execute('SELECT 1 FROM datasets WHERE dataset_id = ?', (dataset_id,)).fetchone():
+                return dataset_id, source_version, vendors
+            conn.execute(
+                f"INSERT INTO vendor_months (dataset_id, vendor, bulan, vendor_pos, {', '.join(METRIC_COLUMNS)}) "
+                f"SELECT ?, vendor, bulan, vendor_pos, {', '.join(METRIC_COLUMNS)} "
+                f"FROM vendor_months WHERE dataset_id = ?", (dataset_id, source_id))
+            positions = {}
+            for vendor in vendors:
+                row = conn.execute('SELECT vendor_pos FROM vendor_months WHERE dataset_id = ? AND vendor = ? LIMIT 1',
+                                   (dataset_id, vendor)).fetchone()
+                if row is not None:
+                    positions[vendor] = row[0]
+            next_pos = conn.execute('SELECT COALESCE(MAX(vendor_pos) + 1, 0) FROM vendor_months WHERE dataset_id = ?',
+                                    (dataset_id,)).fetchone()[0]
+            for vendor in vendors:
+                if vendor not in positions:
+                    positions[vendor] = next_pos
+                    next_pos += 1
+            self._insert(conn, dataset_id, df, df['vendor'].astype(str).map(positions).values)
+            self._touch(conn, dataset_id, name, fingerprint)
+        return dataset_id, source_version, vendors
+
+    def _insert(self, conn, dataset_id, df, positions):
+        missing = [column for column in DB_COLUMNS if column not in df.columns]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        rows = zip(
+            df['vendor'].astype(str).tolist(),
+            pd.to_datetime(df['bulan']).dt.strftime('%Y-%m-%d').tolist(),
+            np.asarray(positions).tolist(),
+            *(df[column].tolist() for column in METRIC_COLUMNS),
+        )
+        placeholders = ', '.join('?' * (len(DB_COLUMNS) + 2))
+        conn.executemany(
+            f"INSERT OR REPLACE INTO vendor_months (dataset_id, vendor, bulan, vendor_pos, "
+            f"{', '.join(METRIC_COLUMNS)}) VALUES ({placeholders})",
+            ((dataset_id, *row) for row in rows),
+        )
+
+    def _touch(self, conn, dataset_id, name, fingerprint):
+        conn.execute(
+            "INSERT INTO datasets (dataset_id, name, version, updated, fingerprint) VALUES (?, ?, 1, ?, ?) "
+            "ON CONFLICT (dataset_id) DO UPDATE SET name = excluded.name, "
+            "version = version + 1, updated = excluded.updated, fingerprint = excluded.fingerprint",
+            (dataset_id, name, datetime.now(timezone.utc).isoformat(timespec='seconds'), fingerprint),
+        )
+
+    def datasets(self):
+        with self._connect() as conn:
+            return pd.read_sql_query(
+                'SELECT d.dataset_id, d.name, d.version, d.updated, COUNT(m.vendor) AS rows '
+                'FROM datasets d LEFT JOIN vendor_months m USING (dataset_id) '
+                'GROUP BY d.dataset_id ORDER BY d.updated DESC', conn)
+
+    def data_version(self, dataset_id):
+        # Cache key for the dataset's current content. The version counter alone repeats
+        # when the file is recreated or another file is used, the content fingerprint does not.
+        with self._connect() as conn:
+            row = conn.execute('SELECT version, fingerprint FROM datasets WHERE dataset_id = ?',
+                               (dataset_id,)).fetchone()
+        return self._version_key(dataset_id, row) if row else None
+
+    @staticmethod
+    def _version_key(dataset_id, row):
+        version, fingerprint = row
+        return f"{dataset_id}-v{version}-{fingerprint}"
+
+class SqlVendorStore:
+    # VendorStore interface over one dataset of a SqliteStore. Only the vendor names and
+    # months are kept in memory; series and rows are queried on demand through the
+    # (dataset_id, vendor, bulan) key. The latest-per-vendor view is queried once and kept,
+    # since an instance only ever serves one dataset version.
+    def __init__(self, db, dataset_id):
+        self.db = db
+        self.dataset_id = dataset_id
+        key = (dataset_id,)
+        self.vendors = db.query(
+            'SELECT vendor FROM vendor_months WHERE dataset_id = ? '
+            'GROUP BY vendor ORDER BY MIN(vendor_pos)', key)['vendor'].astype(str).tolist()
+        months = db.query('SELECT DISTINCT bulan FROM vendor_months WHERE dataset_id = ? ORDER BY bulan', key)
+        self.months = pd.DatetimeIndex(months['bulan'])
+        self.month_labels = list(self.months.strftime('%B %Y'))
+        self._rows = db.scalar('SELECT COUNT(*) FROM vendor_months WHERE dataset_id = ?', key)
+        self._latest = None
+
+    def __len__(self):
+        return self._rows
+
+    def series(self, vendor):
+        return self.db.query(
+            f'SELECT {DB_SELECT} FROM vendor_months WHERE dataset_id = ? AND vendor = ? ORDER BY bulan',
+            (self.dataset_id, vendor))
+
+    def row(self, vendor, month):
+        rows = self.db.query(
+            f'SELECT {DB_SELECT} FROM vendor_months WHERE dataset_id = ? AND vendor = ? AND bulan = ?',
+            (self.dataset_id, vendor, f"{pd.Timestamp(month):%Y-%m-%d}"))
+        return rows.iloc[0] if len(rows) else None
+
+    def month_rows(self, month):
+        return self.db.query(
+            f'SELECT {DB_SELECT} FROM vendor_months WHERE dataset_id = ? AND bulan = ? ORDER BY vendor_pos',
+            (self.dataset_id, f"{pd.Timestamp(month):%Y-%m-%d}"))
+
+    def latest(self):
+        if self._latest is None:
+            self._latest = self._query_latest()
+        return self._latest
+
+    def _query_latest(self):
+        latest = self.db.query(
+            f'SELECT {", ".join("m." + column for column in DB_COLUMNS)} FROM vendor_months m '
+            'JOIN (SELECT vendor, MAX(bulan) AS bulan FROM vendor_months WHERE dataset_id = ? GROUP BY vendor) l '
+            'ON m.vendor = l.vendor AND m.bulan = l.bulan WHERE m.dataset_id = ? ORDER BY m.vendor_pos',
+            (self.dataset_id, self.dataset_id))
+        return latest.set_index('vendor', drop=False)
+
+    def _column(self, column):
+        # Column names are interpolated into SQL, so only known metrics are accepted
+        if column not in METRIC_COLUMNS:
+            raise ValueError(f"Unknown column: {column}")
+        return column
+
+    def vendor_means(self, column):
+        column = self._column(column)
+        means = self.db.query(
+            f'SELECT AVG({column}) AS value FROM vendor_months WHERE dataset_id = ? '
+            'GROUP BY vendor ORDER BY MIN(vendor_pos)', (self.dataset_id,))
+        return means['value'].values.astype(float)
+
+    def matrix(self, column):
+        column = self._column(column)
+        cells = self.db.query(
+            f'SELECT vendor, bulan, {column} FROM vendor_months WHERE dataset_id = ?', (self.dataset_id,))
+        grid = np.full((len(self.vendors), len(self.months)), np.nan)
+        vendor_pos = pd.Index(self.vendors).get_indexer(cells['vendor'].astype(str))
+        grid[vendor_pos, self.months.get_indexer(cells['bulan'])] = cells[column].values
+        return grid
+
+    def risk_distribution(self, thresholds=DEFAULT_RISK_THRESHOLDS):
+        # Same bands as classify_risk, counted by the database instead of fetching the rows
+        low_from, medium_from = thresholds
+        cells = self.db.query(
+            'SELECT bulan, CASE WHEN skor_evaluasi >= ? THEN 0 WHEN skor_evaluasi >= ? THEN 1 ELSE 2 END AS band, '
+            'COUNT(*) AS vendors FROM vendor_months WHERE dataset_id = ? GROUP BY bulan, band',
+            (low_from, medium_from, self.dataset_id))
+        counts = np.zeros((len(self.months), len(RISK_LEVELS)), dtype=np.int64)
+        counts[self.months.get_indexer(cells['bulan']), cells['band'].values] = cells['vendors'].values
+        return pd.DataFrame(counts, index=self.months.rename('bulan'), columns=RISK_LEVELS)
+
+    def subset(self, vendors):
+        # In-memory store of just these vendors' rows, fetched by key in batches
+        # (SQLite caps the number of bound parameters per statement)
+        frames = []
+        for start in range(0, len(vendors), SQL_BATCH):
+            batch = list(vendors[start:start + SQL_BATCH])
+            frames.append(self.db.query(
+                f'SELECT {DB_SELECT} FROM vendor_months WHERE dataset_id = ? '
+                f'AND vendor IN ({", ".join("?" * len(batch))}) ORDER BY vendor_pos, bulan',
+                (self.dataset_id, *batch)).astype({'vendor': str}))
+        rows = pd.concat(frames, ignore_index=True) if frames else self.page(1, 0).astype({'vendor': str})
+        return VendorStore(normalize_dataset(rows))
+
+    def page(self, page, page_size):
+        return self.db.query(
+            f'SELECT {DB_SELECT} FROM vendor_months WHERE dataset_id = ? '
+            'ORDER BY vendor_pos, bulan LIMIT ? OFFSET ?',
+            (self.dataset_id, page_size, (page - 1) * page_size))
+
+    def iter_chunks(self, chunk_rows):
+        # One cursor for the whole scan, so exporting never holds more than a chunk
+        with self.db._connect() as conn:
+            cursor = conn.execute(
+                f'SELECT {DB_SELECT} FROM vendor_months WHERE dataset_id = ? ORDER BY vendor_pos, bulan',
+                (self.dataset_id,))
+            while True:
+                records = cursor.fetchmany(chunk_rows)
+                if not records:
+                    break
+                yield self.db._decode(pd.DataFrame.from_records(records, columns=DB_COLUMNS))
+
+def build_store_detail_excel(store, target):
+    # In-memory stores export their frame; SQLite-backed ones stream straight from a cursor
+    if isinstance(store, VendorStore):
+        build_detail_excel(store.df, target)
+    else:
+        write_excel_streaming(map(to_display_frame, store.iter_chunks(EXPORT_CHUNK_ROWS)),
+                              DISPLAY_COLUMNS.values(), 'Details', target)
+
+# Optional on-disk cache for derived data, shared by every process on the host
+DISK_CACHE_VERSION = 1  # bump when a cached value's layout changes
+DISK_CACHE_MAX_BYTES = 1024 * 2**20
+DISK_CACHE_SUFFIX = '.bin'
+EVICT_INTERVAL_S = 60
+EVICT_GRACE_S = 60  # entries used this recently are never evicted, so a reader cannot lose them
+TMP_MAX_AGE_S = 3600  # temp files older than this were left by a writer that died
+
+class DiskCache:
+    # Entries are files named by a digest of (namespace, fingerprint, params). Writers
+    # publish with an atomic rename, so readers see a whole entry or none, and any process
+    # may evict: losing a race to unlink a file is harmless. Each file's mtime is when it was
+    # written (for the TTL) and its atime when it was last used (for LRU eviction).
+    # Values are pickled; only point this at a directory the app alone writes to.
+    def __init__(self, directory, ttl=None, max_bytes=DISK_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._last_evict = 0.0
+        self.evict()
+
+    def path(self, namespace, fingerprint, params=()):
+        key = repr((DISK_CACHE_VERSION, namespace, fingerprint, params)).encode()
+        return self.directory / namespace / (hashlib.blake2b(key, digest_size=16).hexdigest() + DISK_CACHE_SUFFIX)
+
+    def _fresh(self, path):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return False
+        if self.ttl is not None and time.time() - stat.st_mtime > self.ttl:
+            return False
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path, (time.time(), stat.st_mtime))
+        return True
+
+    def _write(self, path, write):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                write(tmp)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        if time.monotonic() - self._last_evict >= EVICT_INTERVAL_S:
+            self.evict()
+
+    def file(self, namespace, fingerprint, params, write):
+        # Path of a cached file, created with `write(fileobj)` when missing or expired
+        path = self.path(namespace, fingerprint, params)
+        if not self._fresh(path):
+            self._write(path, write)
+        return path
+
+    def get_or_compute(self, namespace, fingerprint, params, compute):
+        path = self.path(namespace, fingerprint, params)
+        if self._fresh(path):
+            try:
+                with open(path, 'rb') as f:
+                    return pickle.load(f)
+            except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+                # Evicted meanwhile, or written by an incompatible version: recompute
+                pass
+        value = compute()
+        self._write(path, lambda f: pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL))
+        return value
+
+    def evict(self):
+        # Drops expired entries and stale temp files, then the least recently used
+        # entries until the cache fits in max_bytes
+        self._last_evict = time.monotonic()
+        now = time.time()
+        entries = []
+        for path in self.directory.glob('*/*'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.suffix == '.tmp':
+                if now - stat.st_mtime > TMP_MAX_AGE_S:
+                    self._unlink(path)
+            elif self.ttl is not None and now - stat.st_mtime > self.ttl:
+                self._unlink(path)
+            else:
+                entries.append((stat.st_atime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for used, size, path in sorted(entries):
+            if total <= self.max_bytes or now - used < EVICT_GRACE_S:
+                break
+            self._unlink(path)
+            total -= size
+
+    def _unlink(self, path):
+        with contextlib.suppress(FileNotFoundError):
+            path.unlink()
@@ -0,0 +1,140 @@
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+import vendor_core as core
+
+# Run from the repository root:  python vendor_reports.py --output reports/ [--input data.xlsx]
+# Writes reports/consolidated/*.xlsx plus one workbook per vendor under reports/vendors/;
+# with --month 2024-05 only that month is reported, under reports/2024-05/.
+VENDORS_PER_TASK = 50
+
+def current_umask():
+    # os.umask can only be read by setting it; report processes are single-threaded
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+def write_atomic(path, write):
+    # A cron run that dies midway never leaves a truncated workbook behind
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.xlsx.tmp')
+    try:
+        # mkstemp creates owner-only files; reports get the usual umask-based mode
+        os.chmod(tmp_path, 0o666 & ~current_umask())
+        with os.fdopen(fd, 'wb') as tmp:
+            write(tmp)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def report_file_names(vendors):
+    # File-system safe, unique names; vendors whose names collide after cleaning get a suffix
+    names, seen = [], {}
+    for vendor in vendors:
+        name = re.sub(r'[^\w.-]+', '_', str(vendor)).strip('._') or 'vendor'
+        seen[name] = seen.get(name, 0) + 1
+        names.append(name if seen[name] == 1 else f"{name}-{seen[name]}")
+    return names
+
+def write_vendor_reports(vendor_df, summary_df, file_names, out_dir):
+    # One pool task: a batch of vendors' rows and summary rows, pickled once per batch
+    store = core.VendorStore(vendor_df)
+    summary_rows = summary_df.set_index('Vendor', drop=False)
+    for vendor in store.vendors:
+        path = Path(out_dir) / f"{file_names[vendor]}.xlsx"
+        write_atomic(path, lambda target: core.build_vendor_report_excel(
+            summary_rows.loc[[vendor]], store.series(vendor), target))
+    return len(store.vendors)
+
+def load_store(args, parser):
+    if args.db:
+        db = core.SqliteStore(args.db)
+        dataset_id = args.dataset
+        if dataset_id is None:
+            datasets = db.datasets()
+            if datasets.empty:
+                parser.error(f"{args.db} holds no datasets")
+            dataset_id = datasets['dataset_id'].iloc[0]
+        return core.SqlVendorStore(db, dataset_id)
+    if args.input:
+        df = core.normalize_dataset(core.read_excel_streaming(Path(args.input).read_bytes()))
+        try:
+            core.validate_dataset(df)
+        except ValueError as exc:
+            parser.error(f"{args.input}: {exc}")
+    else:
+        df = core.normalize_dataset(core.generate_vendor_data(args.vendors, args.months))
+    return core.VendorStore(df)
+
+def month_stores(store, month, parser):
+    # The vendors reported in `month`: their history up to and including it, which the
+    # summary is built from as the Laporan page showed it then, and the month's own rows,
+    # the only ones written as detail. A monthly run rewrites nothing but that period.
+    rows = store.month_rows(month)
+    if rows.empty:
+        parser.error(f"no rows for {month:%Y-%m}; the dataset covers "
+                     f"{store.months.min():%Y-%m} to {store.months.max():%Y-%m}")
+    month_store = core.VendorStore(core.normalize_dataset(rows))
+    history = store.subset(month_store.vendors).df
+    return core.VendorStore(history[history['bulan'] <= month]), month_store
+
+def parse_month(value):
+    try:
+        return pd.Timestamp(value).to_period('M').to_timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a month: {value!r} (expected YYYY-MM)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the VendorPro Excel reports without the dashboard.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--input', help="Excel file in the upload format")
+    source.add_argument('--db', help="SQLite database written with VENDORPRO_DB")
+    parser.add_argument('--dataset', help="dataset id within --db (default: the most recently updated)")
+    parser.add_argument('--vendors', type=int, default=6, help="synthetic data size when no source is given")
+    parser.add_argument('--months', type=int, default=3)
+    parser.add_argument('--output', default='reports')
+    parser.add_argument('--month', type=parse_month, help="report only this month (YYYY-MM)")
+    parser.add_argument('--risk-thresholds', type=int, nargs=2, default=core.DEFAULT_RISK_THRESHOLDS,
+                        metavar=('LOW_FROM', 'MEDIUM_FROM'), help="lowest Low Risk and Medium Risk scores")
+    parser.add_argument('--workers', type=int, help="process pool size (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    store = history = load_store(args, parser)
+    out_dir = Path(args.output)
+    if args.month is not None:
+        history, store = month_stores(store, args.month, parser)
+        out_dir = out_dir / f"{args.month:%Y-%m}"
+    summary = core.format_vendor_summary(core.build_vendor_summary(history, tuple(args.risk_thresholds)))
+    file_names = dict(zip(store.vendors, report_file_names(store.vendors)))
+    vendor_dir = out_dir / 'vendors'
+    consolidated_dir = out_dir / 'consolidated'
+    vendor_dir.mkdir(parents=True, exist_ok=True)
+    consolidated_dir.mkdir(parents=True, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = []
+        for first in range(0, len(store.vendors), VENDORS_PER_TASK):
+            batch = store.vendors[first:first + VENDORS_PER_TASK]
+            futures.append(pool.submit(
+                write_vendor_reports, store.subset(batch).df, summary[summary['Vendor'].isin(batch)],
+                {vendor: file_names[vendor] for vendor in batch}, vendor_dir))
+        # The consolidated workbooks are written here while the pool handles the vendors
+        write_atomic(consolidated_dir / 'vendor_summary.xlsx', lambda target: core.build_summary_excel(summary, target))
+        write_atomic(consolidated_dir / 'vendor_detail.xlsx', lambda target: core.build_store_detail_excel(store, target))
+        written = sum(future.result() for future in futures)
+
+    print(f"{written} vendor reports and 2 consolidated reports ({len(store)} rows, "
+          f"{len(store.months)} months) in {time.perf_counter() - start:.1f} s -> {out_dir}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())